@@ -0,0 +1,41 @@
+"""Medição e resumo dos resultados (formato comum a todos os benchmarks)"""
+from connectDB.instrumentation import QueryStats, query_stats
+import statistics
+import math
+import time
+
+
+def percentile(samples: list[float], fraction: float) -> float:
+    """Percentil por posição (nearest-rank) de uma lista ordenada"""
+    return samples[max(math.ceil(fraction * len(samples)) - 1, 0)]
+
+
+def summarize(durations: list[float], elapsed: float, queries: list[int], errors: int = 0) -> dict:
+    """Resumo de uma série de execuções (durações em segundos)"""
+    samples = sorted(d * 1000 for d in durations)
+    if not samples:
+        return {"runs": 0, "errors": errors}
+    return {
+        "runs": len(samples),
+        "errors": errors,
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(percentile(samples, 0.50), 3),
+        "p95_ms": round(percentile(samples, 0.95), 3),
+        "p99_ms": round(percentile(samples, 0.99), 3),
+        "max_ms": round(samples[-1], 3),
+        "ops_per_s": round(len(samples) / elapsed, 2) if elapsed else None,
+        "queries_per_op": round(statistics.fmean(queries), 2) if queries else None,
+    }
+
+
+async def timed(func, *args) -> tuple[float, int]:
+    """Executa `func` medindo o tempo e as consultas SQL feitas por ela"""
+    stats = QueryStats()
+    token = query_stats.set(stats)
+    start = time.perf_counter()
+    try:
+        await func(*args)
+    finally:
+        duration = time.perf_counter() - start
+        query_stats.reset(token)
+    return duration, stats.count
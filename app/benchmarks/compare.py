@@ -0,0 +1,68 @@
+"""Compara dois resultados de benchmarks.run (base x atual).
+
+Uso (a partir da pasta app):
+    python -m benchmarks.compare base.json atual.json --threshold 10
+
+Sai com código 1 se algum caso piorar o p95 acima do limite (%) ou passar a
+fazer mais consultas por operação.
+"""
+import argparse
+import json
+import sys
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "ops_per_s", "queries_per_op")
+
+
+def change(base, current) -> float | None:
+    if base in (None, 0) or current is None:
+        return None
+    return round((current - base) / base * 100, 1)
+
+
+def compare(base: dict, current: dict, threshold: float) -> tuple[list[dict], list[str]]:
+    rows, regressions = [], []
+    for suite in ("micro", "macro"):
+        for name, result in current.get(suite, {}).items():
+            previous = base.get(suite, {}).get(name)
+            if previous is None:
+                continue
+
+            row = {"case": f"{suite}.{name}"}
+            for metric in METRICS:
+                row[metric] = [previous.get(metric), result.get(metric), change(previous.get(metric), result.get(metric))]
+            rows.append(row)
+
+            p95_change = row["p95_ms"][2]
+            if p95_change is not None and p95_change > threshold:
+                regressions.append(f"{row['case']}: p95 +{p95_change}%")
+            if (result.get("queries_per_op") or 0) > (previous.get("queries_per_op") or 0):
+                regressions.append(
+                    f"{row['case']}: queries/op {previous.get('queries_per_op')} -> {result.get('queries_per_op')}"
+                )
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Piora máxima aceita no p95 (%%)")
+    args = parser.parse_args()
+
+    with open(args.base, encoding="utf-8") as file:
+        base = json.load(file)
+    with open(args.current, encoding="utf-8") as file:
+        current = json.load(file)
+
+    rows, regressions = compare(base, current, args.threshold)
+    print(json.dumps({
+        "base": base.get("commit"),
+        "current": current.get("commit"),
+        "cases": rows,
+        "regressions": regressions,
+    }, indent=2, ensure_ascii=False))
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Massa de dados sintética e determinística para os benchmarks.
+
+Apaga as tabelas do catálogo, clientes e pedidos e as recria com o gerador de
+scripts.generate_data. Use apenas em um banco dedicado aos benchmarks.
+"""
+from scripts.generate_data import generate
+from datetime import datetime
+
+# Tamanhos pré-definidos da massa de dados
+SIZES = {
+    "small": {"categories": 20, "products": 1_000, "clients": 2_000, "orders": 10_000},
+    "medium": {"categories": 50, "products": 10_000, "clients": 20_000, "orders": 100_000},
+    "large": {"categories": 100, "products": 50_000, "clients": 100_000, "orders": 1_000_000},
+}
+
+# Estoque alto para que os cenários de criação de pedidos não esgotem produtos
+BENCHMARK_STOCK = 1_000_000
+# Data final fixa: a massa não depende do dia em que o benchmark roda
+END_DATE = datetime(2025, 1, 1)
+
+
+async def seed(size: dict, seed: int = 42) -> dict:
+    """Recria a massa de dados; a mesma semente gera sempre os mesmos registros"""
+    await generate(
+        size, seed=seed, days=365, end_date=END_DATE, stock=BENCHMARK_STOCK,
+        inactive=0, truncate=True, log=lambda message: None,
+    )
+    return {"seed": seed, **size}
@@ -0,0 +1,139 @@
+"""Cenários de carga contra a aplicação ASGI em processo (sem rede)"""
+from httpx import ASGITransport, AsyncClient
+from main import app
+from benchmarks.common import summarize
+from abc import ABC, abstractmethod
+import asyncio
+import random
+import time
+import re
+
+SERVER_TIMING_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+class Scenario(ABC):
+    """Cenário com estado por usuário virtual; step() faz uma requisição"""
+
+    def __init__(self, size: dict, page_size: int):
+        self.size = size
+        self.page_size = page_size
+
+    def new_state(self) -> dict:
+        return {}
+
+    @abstractmethod
+    async def step(self, client: AsyncClient, rng: random.Random, state: dict):
+        ...
+
+
+class BrowseCatalog(Scenario):
+    """Vitrine: listagem por categoria, detalhe de produto e categorias"""
+
+    async def step(self, client, rng, state):
+        choice = rng.random()
+        if choice < 0.4:
+            category = rng.randint(1, self.size["categories"])
+            return await client.get(f"/products/?limit={self.page_size}&category={category}")
+        if choice < 0.9:
+            return await client.get(f"/products/{rng.randint(1, self.size['products'])}")
+        return await client.get("/categories/")
+
+
+class PlaceOrders(Scenario):
+    """Criação de pedidos com 1 a 4 itens"""
+
+    async def step(self, client, rng, state):
+        items = [
+            {"produto_id": product_id, "quantidade": rng.randint(1, 3), "preco_unitario": 10.0}
+            for product_id in rng.sample(range(1, self.size["products"] + 1), rng.randint(1, 4))
+        ]
+        return await client.post("/orders/", json={
+            "cliente_id": rng.randint(1, self.size["clients"]),
+            "metodo_pagamento": "Pix",
+            "endereco_entrega": "Rua do Benchmark, 1",
+            "itens_pedido": items,
+        })
+
+
+class ListOrdersCursor(Scenario):
+    """Navega páginas de pedidos seguindo o X-Next-Cursor (até 50 páginas por usuário)"""
+
+    MAX_PAGES = 50
+
+    def new_state(self):
+        return {"cursor": None, "pages": 0}
+
+    async def step(self, client, rng, state):
+        url = f"/orders/?limit={self.page_size}"
+        if state["cursor"]:
+            url += f"&cursor={state['cursor']}"
+        response = await client.get(url)
+
+        state["pages"] += 1
+        state["cursor"] = response.headers.get("X-Next-Cursor")
+        if state["cursor"] is None or state["pages"] >= self.MAX_PAGES:
+            state.update(cursor=None, pages=0)
+        return response
+
+
+class ListOrdersDeepOffset(Scenario):
+    """Páginas profundas de pedidos por offset (comparação com o cursor)"""
+
+    async def step(self, client, rng, state):
+        skip = rng.randint(int(self.size["orders"] * 0.5), max(self.size["orders"] - self.page_size, 0))
+        return await client.get(f"/orders/?limit={self.page_size}&skip={skip}")
+
+
+SCENARIOS = {
+    "browse_catalog": BrowseCatalog,
+    "place_orders": PlaceOrders,
+    "list_orders_cursor": ListOrdersCursor,
+    "list_orders_deep_offset": ListOrdersDeepOffset,
+}
+
+
+async def run_scenario(scenario: Scenario, token: str, seed: str, requests: int, concurrency: int) -> dict:
+    durations, queries = [], []
+    errors = 0
+    remaining = requests
+
+    transport = ASGITransport(app=app)
+    headers = {"Authorization": f"Bearer {token}"}
+    async with AsyncClient(transport=transport, base_url="http://benchmark", headers=headers) as client:
+
+        async def virtual_user(index: int):
+            nonlocal remaining, errors
+            rng = random.Random(f"{seed}:{index}")
+            state = scenario.new_state()
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                response = await scenario.step(client, rng, state)
+                durations.append(time.perf_counter() - start)
+
+                if response.status_code >= 400:
+                    errors += 1
+                match = SERVER_TIMING_QUERIES.search(response.headers.get("Server-Timing", ""))
+                if match:
+                    queries.append(int(match.group(1)))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(virtual_user(index) for index in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    result = summarize(durations, elapsed, queries, errors)
+    result["concurrency"] = concurrency
+    return result
+
+
+async def run_macro(size: dict, token: str, seed: int, requests: int, concurrency: int,
+                    page_size: int = 50, only: set[str] | None = None) -> dict:
+    results = {}
+    for name, scenario_class in SCENARIOS.items():
+        if only and name not in only:
+            continue
+        scenario = scenario_class(size, page_size)
+        # Aquecimento curto (caches, pool, statements preparados)
+        await run_scenario(scenario, token, f"{seed}:{name}:warmup", min(requests, 20), 1)
+        results[name] = await run_scenario(scenario, token, f"{seed}:{name}", requests, concurrency)
+    return results
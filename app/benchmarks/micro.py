@@ -0,0 +1,119 @@
+"""Micro-benchmarks das funções de serviço, executadas direto sobre o banco"""
+from sqlalchemy import select
+from connectDB.database import SessionLocal, Pedido, engine
+from schemas.orders import OrderCreate
+from services.products import get_products, get_product, product_cache
+from services.categories import get_categories_service
+from services.clients import get_clients
+from services.orders import get_orders, create_order
+from services.utilities import encode_cursor
+from benchmarks.common import summarize, timed
+from contextlib import asynccontextmanager
+import random
+import time
+
+# Casos que gravam no banco: cada execução é desfeita, para que a massa medida
+# pelas execuções e casos seguintes continue sendo a massa semeada
+WRITE_CASES = {"create_order"}
+
+
+async def order_cursor_at(position: int) -> str:
+    """Cursor equivalente a pular `position` pedidos na listagem"""
+    async with SessionLocal() as db:
+        row = (await db.execute(
+            select(Pedido.criado_em, Pedido.id)
+            .order_by(Pedido.criado_em.desc(), Pedido.id.desc())
+            .offset(position).limit(1)
+        )).first()
+    return encode_cursor(row.criado_em.isoformat(), row.id)
+
+
+def order_payload(rng: random.Random, size: dict) -> OrderCreate:
+    return OrderCreate.model_validate({
+        "cliente_id": rng.randint(1, size["clients"]),
+        "metodo_pagamento": "Pix",
+        "endereco_entrega": "Rua do Benchmark, 1",
+        "itens_pedido": [
+            {"produto_id": product_id, "quantidade": 1, "preco_unitario": 10.0}
+            for product_id in rng.sample(range(1, size["products"] + 1), 3)
+        ],
+    })
+
+
+async def build_cases(size: dict, user_id: int, page_size: int) -> dict:
+    """Funções de serviço medidas; cada uma recebe (db, rng)"""
+    deep = int(size["orders"] * 0.9)
+    deep_cursor = await order_cursor_at(deep)
+
+    async def product_uncached(db, rng):
+        product_cache.clear()
+        await get_product(db, rng.randint(1, size["products"]))
+
+    return {
+        "get_products": lambda db, rng: get_products(db, limit=page_size),
+        "get_products_category": lambda db, rng: get_products(
+            db, limit=page_size, category=rng.randint(1, size["categories"])
+        ),
+        "get_products_no_images": lambda db, rng: get_products(db, limit=page_size, expand=set()),
+        "get_product_uncached": product_uncached,
+        "get_product_cached": lambda db, rng: get_product(db, rng.randint(1, 10)),
+        "get_categories": lambda db, rng: get_categories_service(db, limit=page_size),
+        "get_clients": lambda db, rng: get_clients(db, limit=page_size),
+        "get_orders": lambda db, rng: get_orders(db, limit=page_size),
+        "get_orders_no_items": lambda db, rng: get_orders(db, limit=page_size, expand=set()),
+        "get_orders_deep_offset": lambda db, rng: get_orders(db, skip=deep, limit=page_size),
+        "get_orders_deep_cursor": lambda db, rng: get_orders(db, limit=page_size, cursor=deep_cursor),
+        "create_order": lambda db, rng: create_order(db, order_payload(rng, size), user_id),
+    }
+
+
+@asynccontextmanager
+async def case_session(rollback: bool):
+    """Sessão de uma execução; com `rollback`, presa a uma transação desfeita no final.
+
+    Em join_transaction_mode="rollback_only" o commit do serviço não encerra a
+    transação externa nem emite savepoints, então as consultas contadas são as
+    mesmas de uma requisição.
+    """
+    if not rollback:
+        async with SessionLocal() as db:
+            yield db
+        return
+
+    async with engine.connect() as conn:
+        await conn.begin()
+        try:
+            async with SessionLocal(bind=conn, join_transaction_mode="rollback_only") as db:
+                yield db
+        finally:
+            await conn.rollback()
+
+
+async def run_case(func, rng: random.Random, iterations: int, warmup: int, rollback: bool = False) -> dict:
+    for _ in range(warmup):
+        async with case_session(rollback) as db:
+            await func(db, rng)
+
+    durations, queries = [], []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        # Uma sessão por execução, como em uma requisição
+        async with case_session(rollback) as db:
+            duration, count = await timed(func, db, rng)
+        durations.append(duration)
+        queries.append(count)
+    return summarize(durations, time.perf_counter() - start, queries)
+
+
+async def run_micro(size: dict, user_id: int, seed: int, iterations: int, warmup: int,
+                    page_size: int = 50, only: set[str] | None = None) -> dict:
+    cases = await build_cases(size, user_id, page_size)
+    results = {}
+    for name, func in cases.items():
+        if only and name not in only:
+            continue
+        # Semente por caso: a sequência de ids sorteados não depende dos outros casos
+        results[name] = await run_case(
+            func, random.Random(f"{seed}:{name}"), iterations, warmup, rollback=name in WRITE_CASES
+        )
+    return results
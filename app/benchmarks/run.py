@@ -0,0 +1,117 @@
+"""Suíte de benchmarks: serviços (micro) e cenários HTTP em processo (macro).
+
+Gera um JSON com p50/p95/p99, operações por segundo e consultas por operação,
+para comparar commits com `python -m benchmarks.compare`.
+
+Uso (a partir da pasta app, com um banco dedicado aos benchmarks):
+    python -m benchmarks.run --reset --size small --output resultados.json
+    python -m benchmarks.run --suite macro --requests 2000 --concurrency 32
+"""
+from sqlalchemy import select, func
+from connectDB.database import (
+    init_db, engine, SessionLocal, Usuario, CategoriaProduto, Produto, Cliente, Pedido
+)
+from services.auth import create_access_token, token_claims
+from benchmarks.dataset import SIZES, seed as seed_dataset
+from benchmarks.micro import run_micro
+from benchmarks.macro import run_macro
+from log_config import configure_logging
+from datetime import datetime, timedelta, timezone
+import subprocess
+import argparse
+import asyncio
+import platform
+import json
+import sys
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def dataset_size() -> dict:
+    """Tamanho da massa já existente (maior id de cada tabela)"""
+    async with SessionLocal() as db:
+        return {
+            name: await db.scalar(select(func.coalesce(func.max(model.id), 0)))
+            for name, model in [
+                ("categories", CategoriaProduto), ("products", Produto),
+                ("clients", Cliente), ("orders", Pedido),
+            ]
+        }
+
+
+async def main(args):
+    # Importar main (cenários macro) configura o log por requisição em INFO no stdout:
+    # aqui só avisos, no stderr, para não misturar com o relatório nem pesar nas latências
+    configure_logging("WARNING", sys.stderr)
+    await init_db()
+
+    size = dict(SIZES[args.size])
+    for name in ("categories", "products", "clients", "orders"):
+        if getattr(args, name) is not None:
+            size[name] = getattr(args, name)
+
+    if args.reset:
+        await seed_dataset(size, args.seed)
+    else:
+        size = await dataset_size()
+        if not size["products"] or not size["orders"]:
+            raise SystemExit("Banco sem massa de dados: execute com --reset")
+
+    async with SessionLocal() as db:
+        user = (await db.execute(select(Usuario).order_by(Usuario.id).limit(1))).scalars().first()
+    token = create_access_token(token_claims(user), expires_delta=timedelta(hours=6))
+
+    only = set(args.only) if args.only else None
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "dataset": {"seed": args.seed, **size},
+        "params": {
+            "iterations": args.iterations, "warmup": args.warmup, "requests": args.requests,
+            "concurrency": args.concurrency, "page_size": args.page_size,
+        },
+    }
+    if "micro" in args.suite:
+        report["micro"] = await run_micro(
+            size, user.id, args.seed, args.iterations, args.warmup, args.page_size, only
+        )
+    if "macro" in args.suite:
+        report["macro"] = await run_macro(
+            size, token, args.seed, args.requests, args.concurrency, args.page_size, only
+        )
+
+    await engine.dispose()
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    print(output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", choices=SIZES, default="small", help="Tamanho da massa de dados")
+    parser.add_argument("--categories", type=int)
+    parser.add_argument("--products", type=int)
+    parser.add_argument("--clients", type=int)
+    parser.add_argument("--orders", type=int)
+    parser.add_argument("--seed", type=int, default=42, help="Semente da massa e dos sorteios")
+    parser.add_argument("--reset", action="store_true", help="Apaga e recria a massa de dados")
+    parser.add_argument("--suite", nargs="+", choices=["micro", "macro"], default=["micro", "macro"])
+    parser.add_argument("--only", nargs="+", help="Executa apenas os casos/cenários informados")
+    parser.add_argument("--iterations", type=int, default=200, help="Execuções por caso (micro)")
+    parser.add_argument("--warmup", type=int, default=10, help="Execuções de aquecimento (micro)")
+    parser.add_argument("--requests", type=int, default=1000, help="Requisições por cenário (macro)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Usuários simultâneos (macro)")
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--output", help="Arquivo JSON com os resultados")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,112 @@
+"""Custo de serialização de uma página de pedidos: response_model x TypeAdapter.
+
+Não precisa de banco: monta objetos do ORM em memória com o mesmo formato que
+GET /orders/ retorna (pedido -> itens -> produto -> imagens).
+
+Uso (a partir da pasta app):
+    python -m benchmarks.serialization --page-size 100 --items 5 --repeat 200
+"""
+from connectDB.database import Pedido, ItemPedido, Produto, ImagemProduto, StatusPedido, MetodoPagamento
+from schemas.orders import OrderList
+from datetime import datetime
+from decimal import Decimal
+import argparse
+import json
+import statistics
+import time
+
+import orjson
+
+
+def build_orders(page_size: int, items: int, images: int) -> list[Pedido]:
+    """Pedidos transientes (sem sessão) com o grafo completo carregado"""
+    now = datetime.now()
+    orders = []
+    for order_id in range(1, page_size + 1):
+        order = Pedido(
+            id=order_id, cliente_id=1, usuario_id=1,
+            status=StatusPedido.PENDENTE, metodo_pagamento=MetodoPagamento.PIX,
+            valor_total=Decimal("150.00"), valor_desconto=Decimal("0.00"), valor_frete=Decimal("0.00"),
+            endereco_entrega="Rua das Flores, 100 - Centro - São Paulo/SP",
+            observacoes="Entregar em horário comercial",
+            criado_em=now, atualizado_em=now,
+        )
+        for index in range(items):
+            product_id = order_id * items + index
+            product = Produto(
+                id=product_id, nome=f"Produto {product_id}", descricao="Descrição do produto para benchmark",
+                valor_venda=Decimal("30.00"), codigo_barras=f"789{product_id:010d}", categoria_id=1,
+                estoque=100, estoque_minimo=5, ativo=True, criado_em=now, atualizado_em=now,
+            )
+            product.imagens = [
+                ImagemProduto(id=product_id * images + i, produto_id=product_id,
+                              url=f"https://cdn.example.com/p/{product_id}/{i}.jpg", ordem=i, criado_em=now)
+                for i in range(images)
+            ]
+            order.itens.append(ItemPedido(
+                id=product_id, pedido_id=order_id, produto_id=product_id, quantidade=1,
+                preco_unitario=Decimal("30.00"), desconto=Decimal("0.00"), total_item=Decimal("30.00"),
+                produto=product,
+            ))
+        orders.append(order)
+    return orders
+
+
+def response_model_path(orders) -> bytes:
+    """O que o FastAPI faz com response_model + JSONResponse: valida, gera dicts e json.dumps"""
+    value = OrderList.validate_python(orders, from_attributes=True)
+    data = OrderList.dump_python(value, mode="json", by_alias=True)
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def orjson_path(orders) -> bytes:
+    """response_model com ORJSONResponse (classe padrão da aplicação)"""
+    value = OrderList.validate_python(orders, from_attributes=True)
+    return orjson.dumps(OrderList.dump_python(value, mode="json", by_alias=True))
+
+
+def adapter_path(orders) -> bytes:
+    """json_list_response: valida uma vez e serializa direto para bytes no pydantic-core"""
+    return OrderList.dump_json(OrderList.validate_python(orders, from_attributes=True), by_alias=True)
+
+
+def measure(func, orders, repeat: int) -> dict:
+    func(orders)  # aquecimento
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(orders)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--items", type=int, default=5)
+    parser.add_argument("--images", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    orders = build_orders(args.page_size, args.items, args.images)
+    results = {
+        name: measure(func, orders, args.repeat)
+        for name, func in [
+            ("response_model", response_model_path),
+            ("response_model_orjson", orjson_path),
+            ("type_adapter", adapter_path),
+        ]
+    }
+    results["speedup"] = round(
+        results["response_model"]["mean_ms"] / results["type_adapter"]["mean_ms"], 2
+    )
+    print(json.dumps({"page_size": args.page_size, "items": args.items, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
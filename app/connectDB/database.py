@@ -1,10 +1,11 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy import (
     Column, Integer, String, Float, Boolean, DateTime, 
-    ForeignKey, Numeric, Enum, CheckConstraint
+    ForeignKey, Numeric, Enum, CheckConstraint, Index, TypeDecorator, select, text
 )
+from connectDB.pool import engine_options
+from connectDB.instrumentation import instrument_engine
 from datetime import datetime, timezone
 import enum
 import os
@@ -15,13 +16,31 @@ DB_HOST = os.getenv("DB_HOST", "localhost")
 DB_NAME = os.getenv("DB_NAME", "fastapi_db")
 
 # Configuração do banco de dados
-DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
+DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_async_engine(DATABASE_URL, **engine_options())
+# Tempo e quantidade de consultas por requisição + log de consultas lentas
+instrument_engine(engine.sync_engine)
+# expire_on_commit=False: em sessões assíncronas não existe lazy load implícito,
+# então os objetos precisam continuar legíveis depois do commit
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
+class UTCDateTime(TypeDecorator):
+    """DateTime sem fuso que aceita datetimes com fuso (convertidos para UTC).
+
+    O asyncpg rejeita datetimes "aware" em colunas TIMESTAMP WITHOUT TIME ZONE,
+    e os serviços gravam datetime.now(timezone.utc).
+    """
+    impl = DateTime
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+
 # Enums
 class StatusPedido(str, enum.Enum):
     PENDENTE = "Pendente"
@@ -46,8 +65,8 @@ class Usuario(Base):
     email = Column(String(100), unique=True, index=True, nullable=False)
     senha_hash = Column(String(255), nullable=False)
     ativo = Column(Boolean, default=True)
-    criado_em = Column(DateTime, default=datetime.now(timezone.utc))
-    atualizado_em = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    criado_em = Column(UTCDateTime, default=datetime.now(timezone.utc))
+    atualizado_em = Column(UTCDateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
 
     pedidos = relationship("Pedido", back_populates="usuario")
 
@@ -55,7 +74,7 @@ class Endereco(Base):
     __tablename__ = "enderecos"
     
     id = Column(Integer, primary_key=True)
-    cliente_id = Column(Integer, ForeignKey('clientes.id'))
+    cliente_id = Column(Integer, ForeignKey('clientes.id'), index=True)
     logradouro = Column(String(100))
     numero = Column(String(20))
     complemento = Column(String(50), nullable=True)
@@ -67,6 +86,11 @@ class Endereco(Base):
     
     cliente = relationship("Cliente", back_populates="enderecos")
 
+    __table_args__ = (
+        # Filtro de cidade/endereço principal em get_clients
+        Index("ix_enderecos_cliente_principal", "cliente_id", postgresql_where=text("principal = true")),
+    )
+
 class Cliente(Base):
     __tablename__ = "clientes"
 
@@ -76,10 +100,10 @@ class Cliente(Base):
     email = Column(String(100), unique=True, index=True, nullable=False)
     cpf = Column(String(11), unique=True, nullable=False)
     telefone = Column(String(20))
-    data_nascimento = Column(DateTime)
+    data_nascimento = Column(UTCDateTime)
     ativo = Column(Boolean, default=True)
-    criado_em = Column(DateTime, default=datetime.now(timezone.utc))
-    atualizado_em = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    criado_em = Column(UTCDateTime, default=datetime.now(timezone.utc))
+    atualizado_em = Column(UTCDateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
 
     pedidos = relationship("Pedido", back_populates="cliente")
     enderecos = relationship("Endereco", back_populates="cliente")
@@ -91,8 +115,8 @@ class CategoriaProduto(Base):
     nome = Column(String(50), unique=True, nullable=False)
     descricao = Column(String(200))
     ativo = Column(Boolean, default=True)
-    criado_em = Column(DateTime, default=datetime.now(timezone.utc))
-    atualizado_em = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    criado_em = Column(UTCDateTime, default=datetime.now(timezone.utc))
+    atualizado_em = Column(UTCDateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
 
     produtos = relationship("Produto", back_populates="categoria")
 
@@ -102,15 +126,15 @@ class Produto(Base):
     id = Column(Integer, primary_key=True, index=True)
     nome = Column(String(100), nullable=False)
     descricao = Column(String(200), nullable=False)
-    valor_venda = Column(Numeric(10, 2), nullable=False)
+    valor_venda = Column(Numeric(10, 2), nullable=False, index=True)
     codigo_barras = Column(String(50), unique=True)
-    categoria_id = Column(Integer, ForeignKey("categorias_produto.id"))
+    categoria_id = Column(Integer, ForeignKey("categorias_produto.id"), index=True)
     estoque = Column(Integer, default=0)
     estoque_minimo = Column(Integer, default=5)
-    data_validade = Column(DateTime)
+    data_validade = Column(UTCDateTime)
     ativo = Column(Boolean, default=True)
-    criado_em = Column(DateTime, default=datetime.now(timezone.utc))
-    atualizado_em = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    criado_em = Column(UTCDateTime, default=datetime.now(timezone.utc))
+    atualizado_em = Column(UTCDateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
 
     categoria = relationship("CategoriaProduto", back_populates="produtos")
     imagens = relationship("ImagemProduto", back_populates="produto")
@@ -119,16 +143,18 @@ class Produto(Base):
     __table_args__ = (
         CheckConstraint('estoque >= 0', name='check_estoque_positivo'),
         CheckConstraint('estoque_minimo >= 0', name='check_estoque_minimo_positivo'),
+        # Catálogo ativo filtrado por categoria e faixa de preço
+        Index("ix_produtos_ativos_categoria_valor", "categoria_id", "valor_venda", postgresql_where=text("ativo = true")),
     )
 
 class ImagemProduto(Base):
     __tablename__ = "imagens_produto"
 
     id = Column(Integer, primary_key=True, index=True)
-    produto_id = Column(Integer, ForeignKey("produtos.id"))
+    produto_id = Column(Integer, ForeignKey("produtos.id"), index=True)
     url = Column(String(255), nullable=False)
     ordem = Column(Integer)
-    criado_em = Column(DateTime, default=datetime.now(timezone.utc))
+    criado_em = Column(UTCDateTime, default=datetime.now(timezone.utc))
 
     produto = relationship("Produto", back_populates="imagens")
 
@@ -137,7 +163,7 @@ class Pedido(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     cliente_id = Column(Integer, ForeignKey("clientes.id"), nullable=False)
-    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
+    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False, index=True)
     status = Column(Enum(StatusPedido), default=StatusPedido.PENDENTE, nullable=False)
     valor_total = Column(Numeric(10, 2), nullable=False)
     valor_desconto = Column(Numeric(10, 2), default=0.00)
@@ -145,20 +171,25 @@ class Pedido(Base):
     metodo_pagamento = Column(Enum(MetodoPagamento))
     observacoes = Column(String(500))
     endereco_entrega = Column(String(200))
-    data_entrega_prevista = Column(DateTime)
-    criado_em = Column(DateTime, default=datetime.now(timezone.utc))
-    atualizado_em = Column(DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    data_entrega_prevista = Column(UTCDateTime)
+    criado_em = Column(UTCDateTime, default=datetime.now(timezone.utc))
+    atualizado_em = Column(UTCDateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
 
     cliente = relationship("Cliente", back_populates="pedidos")
     usuario = relationship("Usuario", back_populates="pedidos")
     itens = relationship("ItemPedido", back_populates="pedido", cascade="all, delete-orphan")
 
+# Ordenação/paginação de get_orders: (criado_em, id) decrescente, com e sem filtro
+Index("ix_pedidos_criado_em_id", Pedido.criado_em.desc(), Pedido.id.desc())
+Index("ix_pedidos_cliente_criado_em", Pedido.cliente_id, Pedido.criado_em.desc(), Pedido.id.desc())
+Index("ix_pedidos_status_criado_em", Pedido.status, Pedido.criado_em.desc())
+
 class ItemPedido(Base):
     __tablename__ = "itens_pedido"
 
     id = Column(Integer, primary_key=True, index=True)
-    pedido_id = Column(Integer, ForeignKey("pedidos.id"), nullable=False)
-    produto_id = Column(Integer, ForeignKey("produtos.id"), nullable=False)
+    pedido_id = Column(Integer, ForeignKey("pedidos.id"), nullable=False, index=True)
+    produto_id = Column(Integer, ForeignKey("produtos.id"), nullable=False, index=True)
     quantidade = Column(Integer, nullable=False)
     preco_unitario = Column(Numeric(10, 2), nullable=False)
     desconto = Column(Numeric(10, 2), default=0.00)
@@ -177,11 +208,12 @@ class TokenBlacklist(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     token = Column(String(255), unique=True, index=True)
-    expirado_em = Column(DateTime)
+    expirado_em = Column(UTCDateTime)
 
 # Função para criar o banco de dados
-def init_db():
-    Base.metadata.create_all(bind=engine)
+async def init_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
     
     user = Usuario(
         nome="system",
@@ -190,19 +222,16 @@ def init_db():
         )
     
     # Verifica se o usuário já existe
-    db = SessionLocal()
-    db_user = db.query(Usuario).filter(Usuario.email == user.email).first()
-    
-    if not db_user:
-        # Cria o usuário se não existir
-        db.add(user)
-        db.commit()
-        db.refresh(user)
+    async with SessionLocal() as db:
+        result = await db.execute(select(Usuario).filter(Usuario.email == user.email))
+        db_user = result.scalars().first()
+        
+        if not db_user:
+            # Cria o usuário se não existir
+            db.add(user)
+            await db.commit()
 
 # Função para obter sessão do banco de dados
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
\ No newline at end of file
+async def get_db():
+    async with SessionLocal() as db:
+        yield db
\ No newline at end of file
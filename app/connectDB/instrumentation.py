@@ -0,0 +1,141 @@
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from greenlet import getcurrent
+import logging
+import json
+import time
+import sys
+import os
+import re
+
+# Consultas acima deste tempo (ms) são registradas no log com SQL normalizado e origem
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+# Diretório da aplicação, usado para localizar a linha que originou a consulta
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Consultas executadas durante uma requisição"""
+
+    __slots__ = ("count", "duration", "slowest", "slowest_statement")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = 0.0
+        self.slowest_statement = None
+
+    def record(self, duration: float, statement: str):
+        self.count += 1
+        self.duration += duration
+        if duration > self.slowest:
+            self.slowest = duration
+            self.slowest_statement = statement
+
+    def server_timing(self) -> str:
+        """Valor do header Server-Timing (durações em ms)"""
+        return (
+            f'db;dur={self.duration * 1000:.2f};desc="{self.count} queries", '
+            f"db-slowest;dur={self.slowest * 1000:.2f}"
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "queries": self.count,
+            "db_ms": round(self.duration * 1000, 2),
+            "slowest_ms": round(self.slowest * 1000, 2),
+            "slowest_sql": normalize_sql(self.slowest_statement) if self.slowest_statement else None,
+        }
+
+
+# Estatísticas da requisição atual (definidas pelo QueryTimingMiddleware). O
+# SQLAlchemy assíncrono executa os eventos em um greenlet que herda o contexto
+# da task, então o ContextVar é visível nos hooks do cursor.
+query_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+WHITESPACE = re.compile(r"\s+")
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+PARAMETER = re.compile(r"\$\d+(?:::[A-Z_ ]+(?:\(\d+(?:,\s*\d+)?\))?(?:\[\])?)?")
+NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+PARAMETER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+REPEATED_ROWS = re.compile(r"(\(\?, \.\.\.\))(?:, \(\?, \.\.\.\))+")
+
+
+def normalize_sql(statement: str, max_length: int = 1000) -> str:
+    """SQL sem valores: parâmetros e literais viram ? e listas (IN, VALUES) são resumidas"""
+    sql = WHITESPACE.sub(" ", statement).strip()
+    sql = STRING_LITERAL.sub("?", sql)
+    sql = PARAMETER.sub("?", sql)
+    sql = NUMBER.sub("?", sql)
+    sql = PARAMETER_LIST.sub("(?, ...)", sql)
+    sql = REPEATED_ROWS.sub(r"\1, ...", sql)
+    return sql[:max_length]
+
+
+def is_app_frame(frame) -> bool:
+    filename = frame.f_code.co_filename
+    return (
+        filename.startswith(APP_DIR)
+        and "site-packages" not in filename
+        and filename != __file__
+    )
+
+
+def call_site() -> str | None:
+    """Primeira linha da aplicação na pilha que executou a consulta.
+
+    No SQLAlchemy assíncrono o cursor roda em um greenlet filho; a pilha do
+    serviço que chamou db.execute está no greenlet pai, suspenso.
+    """
+    frames = [sys._getframe(1)]
+    parent = getcurrent().parent
+    if parent is not None and parent.gr_frame is not None:
+        frames.append(parent.gr_frame)
+
+    for frame in frames:
+        while frame is not None:
+            if is_app_frame(frame):
+                filename = os.path.relpath(frame.f_code.co_filename, APP_DIR)
+                return f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+            frame = frame.f_back
+    return None
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+
+    stats = query_stats.get()
+    if stats is not None:
+        stats.record(duration, statement)
+
+    if duration * 1000 >= SLOW_QUERY_MS:
+        logger.warning(json.dumps({
+            "event": "slow_query",
+            "duration_ms": round(duration * 1000, 2),
+            "sql": normalize_sql(statement),
+            "call_site": call_site(),
+            "executemany": executemany,
+        }))
+
+
+def handle_error(context):
+    # Consulta com erro não passa por after_cursor_execute
+    if context.connection is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+def instrument_engine(engine: Engine):
+    """Registra os hooks de tempo de consulta no engine (síncrono) do SQLAlchemy"""
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine, "handle_error", handle_error)
@@ -0,0 +1,126 @@
+"""Migrações versionadas do banco, aplicadas como um passo explícito do deploy.
+
+Não rodam na inicialização da aplicação: um CREATE INDEX CONCURRENTLY longo
+bloquearia o startup de todos os workers.
+
+Uso (a partir da pasta app, antes de subir a nova versão):
+    python -m connectDB.migrations
+"""
+from connectDB.database import DB_USER, DB_PASSWORD, DB_HOST, DB_NAME
+import asyncio
+import asyncpg
+import sys
+import os
+
+# Host do PostgreSQL acessado diretamente (nunca via PgBouncer): o advisory lock
+# é de sessão e precisa que lock e unlock rodem no mesmo backend
+DB_MIGRATION_HOST = os.getenv("DB_MIGRATION_HOST", DB_HOST)
+
+# Chave do advisory lock que impede dois processos de migrarem ao mesmo tempo
+MIGRATION_LOCK_ID = 720_251
+
+# Migrações versionadas, aplicadas em ordem e registradas em schema_migrations.
+# Índices usam CONCURRENTLY para não bloquear escrita nas tabelas em produção,
+# por isso cada comando roda fora de transação.
+MIGRATIONS = [
+    (
+        "0001",
+        "indices para filtros e joins das listagens",
+        [
+            # pedidos: get_orders ordena por (criado_em, id) e filtra por cliente/status
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_pedidos_criado_em_id "
+            "ON pedidos (criado_em DESC, id DESC)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_pedidos_cliente_criado_em "
+            "ON pedidos (cliente_id, criado_em DESC, id DESC)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_pedidos_status_criado_em "
+            "ON pedidos (status, criado_em DESC)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_pedidos_usuario_id "
+            "ON pedidos (usuario_id)",
+            # itens_pedido: carga dos itens do pedido, filtro por categoria e delete_product
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_itens_pedido_pedido_id "
+            "ON itens_pedido (pedido_id)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_itens_pedido_produto_id "
+            "ON itens_pedido (produto_id)",
+            # produtos: filtros de get_products e delete_category_service
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_produtos_categoria_id "
+            "ON produtos (categoria_id)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_produtos_valor_venda "
+            "ON produtos (valor_venda)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_produtos_ativos_categoria_valor "
+            "ON produtos (categoria_id, valor_venda) WHERE ativo = true",
+            # imagens_produto: carga das imagens dos produtos
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_imagens_produto_produto_id "
+            "ON imagens_produto (produto_id)",
+            # enderecos: get_addresses e filtro de cidade do endereço principal
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_enderecos_cliente_id "
+            "ON enderecos (cliente_id)",
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_enderecos_cliente_principal "
+            "ON enderecos (cliente_id) WHERE principal = true",
+        ],
+    ),
+]
+
+
+async def drop_invalid_indexes(conn: asyncpg.Connection, statements: list[str]):
+    """Remove índices deixados inválidos por um CREATE INDEX CONCURRENTLY interrompido"""
+    rows = await conn.fetch(
+        "SELECT c.relname FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE NOT i.indisvalid"
+    )
+    for (name,) in rows:
+        if any(f" {name} " in statement for statement in statements):
+            await conn.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+def migration_dsn() -> str:
+    return f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_MIGRATION_HOST}/{DB_NAME}"
+
+
+async def run_migrations(dsn: str) -> list[str] | None:
+    """Aplica as migrações ainda não registradas em schema_migrations.
+
+    Retorna as versões aplicadas, ou None se outro processo já está migrando.
+    """
+    # Conexão dedicada, fora do pool; sem transação explícita cada comando é
+    # autocommit, como o CONCURRENTLY exige
+    conn = await asyncpg.connect(dsn)
+    try:
+        if not await conn.fetchval("SELECT pg_try_advisory_lock($1)", MIGRATION_LOCK_ID):
+            return None
+        try:
+            await conn.execute(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                "versao VARCHAR(20) PRIMARY KEY, "
+                "descricao VARCHAR(200), "
+                "aplicado_em TIMESTAMP DEFAULT now())"
+            )
+            applied = {row["versao"] for row in await conn.fetch("SELECT versao FROM schema_migrations")}
+
+            versions = []
+            for version, description, statements in MIGRATIONS:
+                if version in applied:
+                    continue
+
+                await drop_invalid_indexes(conn, statements)
+                for statement in statements:
+                    await conn.execute(statement)
+
+                await conn.execute(
+                    "INSERT INTO schema_migrations (versao, descricao) VALUES ($1, $2)",
+                    version, description,
+                )
+                versions.append(version)
+            return versions
+        finally:
+            await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_ID)
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    applied = asyncio.run(run_migrations(migration_dsn()))
+    if applied is None:
+        print("Another process is running the migrations; skipped")
+        sys.exit(1)
+    print(f"Applied migrations: {', '.join(applied)}" if applied else "Database is up to date")
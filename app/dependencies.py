@@ -2,15 +2,16 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 import jwt
 from jwt.exceptions import InvalidTokenError
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from connectDB.database import get_db, Usuario
-from schemas.auth import TokenData
-from services.auth import verify_token
+from schemas.auth import TokenData, CurrentUser
+from services.auth import verify_token, user_cache, cache_user, JWT_EMBED_CLAIMS, ADMIN_EMAILS
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> CurrentUser:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -25,7 +26,29 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except InvalidTokenError:
         raise credentials_exception
     
-    user = db.query(Usuario).filter(Usuario.email == token_data.email).first()
+    # Token com id e status embutidos dispensa o banco; a desativação do usuário só vale
+    # quando o token expira, por isso ele tem validade curta (JWT_EMBED_CLAIMS_EXPIRE_MINUTES)
+    if JWT_EMBED_CLAIMS and "uid" in payload:
+        if not payload.get("active", False):
+            raise credentials_exception
+        return CurrentUser(id=payload["uid"], email=token_data.email, ativo=True)
+    
+    user = user_cache.get(token_data.email)
+    if user is not None:
+        return user
+    
+    result = await db.execute(select(Usuario).filter(Usuario.email == token_data.email))
+    user = result.scalars().first()
     if user is None:
         raise credentials_exception
-    return user
+    return cache_user(user)
+
+
+async def get_admin_user(current_user: CurrentUser = Depends(get_current_user)):
+    """Usuário autenticado cujo e-mail está em ADMIN_EMAILS"""
+    if current_user.email.lower() not in ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required",
+        )
+    return current_user
@@ -0,0 +1,22 @@
+import logging
+import sys
+import os
+
+# Nível dos logs da aplicação (log estruturado por requisição em INFO, consultas lentas em WARNING)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Loggers da aplicação; o `fastapi run`/uvicorn só configura os loggers uvicorn.*
+APP_LOGGERS = ("middleware", "connectDB", "services")
+
+
+def configure_logging(level: str = LOG_LEVEL, stream=sys.stdout):
+    """Envia os logs da aplicação para `stream` no nível `level` (idempotente)"""
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s %(message)s"))
+    for name in APP_LOGGERS:
+        logger = logging.getLogger(name)
+        logger.setLevel(level)
+        # Substitui o handler anterior: uma nova chamada pode trocar o destino
+        logger.handlers = [handler]
+        # Sem propagar para o root, para não duplicar se ele também tiver handler
+        logger.propagate = False
@@ -1,13 +1,49 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from routers import auth, clients, products, orders, categories
-from connectDB.database import init_db
+from middleware import CompressionMiddleware, QueryTimingMiddleware, MetricsMiddleware, ProfilerMiddleware
+from routers import auth, clients, products, orders, categories, internal, metrics
+from connectDB.database import init_db, engine
+from services.invalidation import invalidation, CACHE_INVALIDATION
+from services.profiler import PROFILER_ENABLED
+from log_config import configure_logging
 
+# Logs da aplicação (request log do QueryTimingMiddleware, consultas lentas, invalidação)
+configure_logging()
 
-app = FastAPI(title="E-commerce API", version="1.0.0")
 
-# Função para criar o banco de dados
-init_db()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Função para criar o banco de dados
+    await init_db()
+    # Escuta as invalidações de cache publicadas pelos outros workers
+    if CACHE_INVALIDATION:
+        invalidation.start()
+    yield
+    await invalidation.stop()
+    await engine.dispose()
+
+
+app = FastAPI(
+    title="E-commerce API",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+# Profiler sob demanda restrito a uma rota (POST /internal/profile?route=...)
+if PROFILER_ENABLED:
+    app.add_middleware(ProfilerMiddleware)
+
+# Latência e requisições em andamento por router (GET /metrics)
+app.add_middleware(MetricsMiddleware)
+
+# Consultas SQL por requisição (Server-Timing + log estruturado)
+app.add_middleware(QueryTimingMiddleware)
+
+# Compressão das respostas (gzip, br e zstd conforme Accept-Encoding)
+app.add_middleware(CompressionMiddleware)
 
 # CORS
 app.add_middleware(
@@ -16,6 +52,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
 )
 
 # Rotas
@@ -23,4 +60,6 @@ app.include_router(auth.router, prefix="/auth", tags=["Autenticação"])
 app.include_router(clients.router, prefix="/clients", tags=["Clientes"])
 app.include_router(products.router, prefix="/products", tags=["Produtos"])
 app.include_router(orders.router, prefix="/orders", tags=["Pedidos"])
-app.include_router(categories.router, prefix="/categories", tags=["Categorias"])
\ No newline at end of file
+app.include_router(categories.router, prefix="/categories", tags=["Categorias"])
+app.include_router(internal.router, prefix="/internal", tags=["Interno"])
+app.include_router(metrics.router)
\ No newline at end of file
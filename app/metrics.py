@@ -0,0 +1,90 @@
+from collections import defaultdict
+from connectDB.pool import Histogram
+import os
+
+# Protege GET /metrics com "Authorization: Bearer <token>" quando definido
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Limites (em segundos) dos buckets do histograma de latência das rotas
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Prefixos dos routers usados como label; o restante é agrupado em "other"
+ROUTER_PREFIXES = {"auth", "clients", "products", "orders", "categories", "internal"}
+
+
+def route_group(path: str) -> str:
+    """Router de uma requisição pelo primeiro segmento do caminho"""
+    prefix = path.split("/", 2)[1] if path.startswith("/") else ""
+    return prefix if prefix in ROUTER_PREFIXES else "other"
+
+
+class Counter:
+    """Contador monotônico (incrementado apenas no event loop)"""
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+
+class RequestMetrics:
+    """Latência, respostas e requisições em andamento por router"""
+
+    def __init__(self):
+        self.durations: dict[tuple[str, str], Histogram] = {}
+        self.responses: dict[tuple[str, str], int] = defaultdict(int)
+        self.in_flight: dict[str, int] = defaultdict(int)
+
+    def observe(self, router: str, method: str, status: int, duration: float):
+        key = (router, method)
+        histogram = self.durations.get(key)
+        if histogram is None:
+            histogram = self.durations[key] = Histogram(REQUEST_BUCKETS)
+        histogram.observe(duration)
+        self.responses[(router, f"{status // 100}xx")] += 1
+
+
+request_metrics = RequestMetrics()
+# Pedidos confirmados (POST /orders e /orders/batch); a vazão é rate() deste contador
+orders_created = Counter()
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: dict | None) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{escape_label(value)}"' for name, value in labels.items())
+    return "{" + pairs + "}"
+
+
+class MetricsWriter:
+    """Monta a saída no formato texto do Prometheus (0.0.4)"""
+
+    def __init__(self):
+        self.lines: list[str] = []
+
+    def family(self, name: str, metric_type: str, help_text: str):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {metric_type}")
+
+    def sample(self, name: str, value, labels: dict | None = None):
+        if value is None:
+            return
+        if isinstance(value, bool):
+            value = int(value)
+        self.lines.append(f"{name}{format_labels(labels)} {value}")
+
+    def histogram(self, name: str, snapshot: dict, labels: dict | None = None):
+        """Amostras _bucket/_sum/_count a partir de Histogram.snapshot()"""
+        labels = labels or {}
+        for bound, count in snapshot["buckets"].items():
+            self.sample(f"{name}_bucket", count, {**labels, "le": bound})
+        self.sample(f"{name}_sum", snapshot["sum"], labels)
+        self.sample(f"{name}_count", snapshot["count"], labels)
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
@@ -0,0 +1,337 @@
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from connectDB.instrumentation import QueryStats, query_stats
+from metrics import request_metrics, route_group
+from services.profiler import profiler
+import logging
+import json
+import time
+import zlib
+import os
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard é opcional
+    zstandard = None
+
+# Configuração da compressão de respostas
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "3"))
+
+logger = logging.getLogger(__name__)
+
+# Tipos de conteúdo compressíveis (JSON das rotas e exportações em streaming)
+COMPRESSIBLE_TYPES = {"application/json", "application/x-ndjson"}
+
+
+class GzipCompressor:
+    def __init__(self):
+        # wbits=31: formato gzip (cabeçalho + trailer)
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliCompressor:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdCompressor:
+    def __init__(self):
+        self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+# Codificações disponíveis, em ordem de preferência do servidor
+COMPRESSORS = {}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = ZstdCompressor
+if brotli is not None:
+    COMPRESSORS["br"] = BrotliCompressor
+COMPRESSORS["gzip"] = GzipCompressor
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Escolhe a codificação pelo header Accept-Encoding (maior q; empate pela preferência do servidor)"""
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[token] = weight
+
+    best, best_weight = None, 0.0
+    for encoding in COMPRESSORS:
+        weight = weights.get(encoding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    return best
+
+
+class CompressionStats:
+    """Contadores de bytes antes e depois da compressão, por codificação"""
+
+    def __init__(self):
+        self.encodings = {
+            encoding: {"responses": 0, "bytes_in": 0, "bytes_out": 0}
+            for encoding in COMPRESSORS
+        }
+        self.skipped = 0
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int):
+        counters = self.encodings[encoding]
+        counters["responses"] += 1
+        counters["bytes_in"] += bytes_in
+        counters["bytes_out"] += bytes_out
+
+    def stats(self) -> dict:
+        bytes_in = sum(c["bytes_in"] for c in self.encodings.values())
+        bytes_out = sum(c["bytes_out"] for c in self.encodings.values())
+        return {
+            "min_size": COMPRESSION_MIN_SIZE,
+            "encodings": self.encodings,
+            "skipped": self.skipped,
+            "bytes_in": bytes_in,
+            "bytes_out": bytes_out,
+            "bytes_saved": bytes_in - bytes_out,
+            "ratio": round(bytes_out / bytes_in, 4) if bytes_in else None,
+        }
+
+
+compression_stats = CompressionStats()
+
+
+class CompressionMiddleware:
+    """Comprime respostas JSON/NDJSON conforme o Accept-Encoding do cliente.
+
+    Respostas completas menores que `minimum_size` seguem sem compressão.
+    Respostas em streaming são comprimidas bloco a bloco, com flush a cada
+    bloco para que o cliente receba os dados conforme são gerados.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = CompressionResponder(self.app, encoding, self.minimum_size)
+        await responder(scope, receive, send)
+
+
+class CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message: Message | None = None
+        self.compressor = None
+        self.passthrough = False
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    def compressible(self, headers: MutableHeaders) -> bool:
+        status = self.start_message["status"]
+        if status < 200 or status in (204, 304):
+            return False
+        if "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+        return content_type in COMPRESSIBLE_TYPES or content_type.startswith("text/")
+
+    async def send_compressed(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Cabeçalhos só são enviados quando o primeiro bloco do corpo chegar
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.flush_start()
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            if not self.compressible(headers) or (not more_body and len(body) < self.minimum_size):
+                compression_stats.skipped += 1
+                self.passthrough = True
+                await self.flush_start()
+                await self.send(message)
+                return
+
+            self.compressor = COMPRESSORS[self.encoding]()
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+
+            if not more_body:
+                data = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(data))
+                compression_stats.record(self.encoding, len(body), len(data))
+                await self.flush_start()
+                await self.send({"type": "http.response.body", "body": data})
+                return
+
+            # Streaming: tamanho final desconhecido
+            if "content-length" in headers:
+                del headers["Content-Length"]
+            await self.flush_start()
+
+        data = self.compressor.compress(body)
+        data += self.compressor.flush() if more_body else self.compressor.finish()
+        self.bytes_in += len(body)
+        self.bytes_out += len(data)
+        if not more_body:
+            compression_stats.record(self.encoding, self.bytes_in, self.bytes_out)
+
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    async def flush_start(self):
+        if self.start_message is not None:
+            message, self.start_message = self.start_message, None
+            await self.send(message)
+
+
+class QueryTimingMiddleware:
+    """Conta as consultas SQL de cada requisição.
+
+    O resumo vai no header Server-Timing (consultas feitas antes do início da
+    resposta) e em um log estruturado ao final da requisição.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = query_stats.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            query_stats.reset(token)
+            # Só monta a linha se o nível INFO estiver ativo (benchmarks rodam em WARNING)
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(json.dumps({
+                    "event": "request",
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+                    **stats.as_dict(),
+                }))
+
+
+class MetricsMiddleware:
+    """Latência por router e requisições em andamento, em contadores em memória"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        router = route_group(scope["path"])
+        request_metrics.in_flight[router] += 1
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            request_metrics.in_flight[router] -= 1
+            request_metrics.observe(router, scope["method"], status_code, time.perf_counter() - start)
+
+
+class ProfilerMiddleware:
+    """Marca as requisições acompanhadas por uma sessão do profiler restrita a uma rota"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        session = profiler.session
+        if scope["type"] != "http" or session is None or not session.matches(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        session.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            session.request_finished()
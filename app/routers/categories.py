@@ -1,19 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from schemas.categories import Category, CategoryCreate, CategoryUpdate
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Annotated, List
+from schemas.categories import Category, CategoryList, CategoryCreate, CategoryUpdate
 from services.categories import (
     create_category_service,
     get_categories_service,
-    get_category_service,
+    read_category_service,
     update_category_service,
-    delete_category_service
+    delete_category_service,
+    category_cursor,
+    categories_etag
 )
+from services.serialization import json_list_response
+from services.http_cache import cache_control, cache_headers, etag_matches, not_modified
 from dependencies import get_db, get_current_user
-from connectDB.database import Usuario
+from schemas.auth import CurrentUser
 
 router = APIRouter()
 
+CACHE_CONTROL = cache_control("categories")
+
 @router.post(
     "/",
     response_model=Category,
@@ -23,10 +29,10 @@ router = APIRouter()
 )
 async def create_category(
     category: CategoryCreate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return create_category_service(db, category)
+    return await create_category_service(db, category)
 
 @router.get(
     "/",
@@ -38,10 +44,23 @@ async def read_categories(
     skip: int = 0,
     limit: int = 100,
     active: bool | None = None,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    cursor: str | None = None,
+    if_none_match: Annotated[str | None, Header()] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return get_categories_service(db, skip, limit, active)
+    # ETag derivado da própria página: nenhuma consulta extra; se o cliente já tem, 304 sem serializar
+    categories = await get_categories_service(db, skip, limit, active, cursor)
+    etag = categories_etag(categories, skip, limit, active, cursor)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, CACHE_CONTROL)
+
+    # Cursor da próxima página (apenas quando a página veio cheia)
+    next_cursor = category_cursor(categories[-1]) if categories and len(categories) == limit else None
+    return json_list_response(
+        CategoryList, categories, next_cursor,
+        headers=cache_headers(etag, CACHE_CONTROL)
+    )
 
 @router.get(
     "/{id}",
@@ -51,10 +70,10 @@ async def read_categories(
 )
 async def read_category(
     id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return get_category_service(db, id)
+    return await read_category_service(db, id)
 
 @router.put(
     "/{id}",
@@ -65,10 +84,10 @@ async def read_category(
 async def update_category(
     id: int,
     category_update: CategoryUpdate,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return update_category_service(db, id, category_update)
+    return await update_category_service(db, id, category_update)
 
 @router.delete(
     "/{id}",
@@ -78,7 +97,7 @@ async def update_category(
 )
 async def delete_category(
     id: int,
-    db: Session = Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    delete_category_service(db, id)
\ No newline at end of file
+    await delete_category_service(db, id)
\ No newline at end of file
@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, Query, status
-from typing import Annotated
+from fastapi import APIRouter, Depends, Query, UploadFile, status
+from typing import Annotated, Literal
 from schemas.clients import (
     Client,
+    ClientList,
     ClientCreate,
     ClientUpdate,
     Address, 
     AddressCreate,
-    AddressUpdate
+    AddressUpdate,
+    ClientImportResult
 )
 from services.clients import (
     get_clients, 
@@ -14,7 +16,11 @@ from services.clients import (
     get_client, 
     update_client, 
     delete_client,
+    client_cursor,
+    CLIENT_RELATIONS,
 )
+from services.client_import import import_clients
+from services.serialization import json_list_response, sparse_fieldset
 from services.address import (
     get_addresses,
     create_address,
@@ -23,7 +29,7 @@ from services.address import (
 )
 from typing import List, Optional
 from dependencies import get_db, get_current_user
-from connectDB.database import Usuario
+from schemas.auth import CurrentUser
 
 
 router = APIRouter()
@@ -34,26 +40,47 @@ async def list_clients(
     limit: Annotated[int, Query(le=100)] = 100,
     name: str | None = None,
     email: str | None = None,
+    cursor: str | None = None,
+    fields: Annotated[str | None, Query(description="Campos retornados, separados por vírgula")] = None,
+    expand: Annotated[str | None, Query(description="Relacionamentos carregados (addresses)")] = None,
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
     ):
     
-    return await get_clients(db, skip, limit, name, email)
+    expanded, include, exclude = sparse_fieldset(Client, CLIENT_RELATIONS, fields, expand)
+    clients = await get_clients(db, skip, limit, name, email, cursor=cursor, expand=expanded)
+    # Cursor da próxima página (apenas quando a página veio cheia)
+    next_cursor = client_cursor(clients[-1]) if clients and len(clients) == limit else None
+    return json_list_response(ClientList, clients, next_cursor, include, exclude)
 
 @router.post("/", response_model=Client, status_code=status.HTTP_201_CREATED)
 async def add_client(
     client: ClientCreate,
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
     ):
     
     return await create_client(db, client)
 
+@router.post("/import", response_model=ClientImportResult)
+async def import_clients_file(
+    file: UploadFile,
+    file_format: Annotated[Literal["csv", "ndjson"] | None, Query(alias="format")] = None,
+    db=Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+    ):
+    
+    # Sem formato explícito, decide pela extensão do arquivo (NDJSON aceita endereços)
+    if file_format is None:
+        filename = (file.filename or "").lower()
+        file_format = "csv" if filename.endswith(".csv") else "ndjson"
+    return await import_clients(db, file.file, file_format)
+
 @router.get("/{id}", response_model=Client)
 async def read_client(
     id: int,
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
     ):
     
     return await get_client(db, id)
@@ -63,7 +90,7 @@ async def edit_client(
     id: int,
     client: ClientUpdate,
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
     ):
     
     return await update_client(db, id, client)
@@ -72,7 +99,7 @@ async def edit_client(
 async def remove_client(
     id: int,
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
     ):
     
     await delete_client(db, id)
@@ -87,7 +114,7 @@ async def read_client_addresses(
     id_address: Optional[int] = None,
     is_primary_address: Optional[bool] = None,
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     return await get_addresses(db, id_client, id_address, is_primary_address)
 
@@ -97,7 +124,7 @@ async def create_client_address(
     id_client: int,
     address: AddressCreate,
     db= Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     return await create_address(db, id_client, address)
 
@@ -107,7 +134,7 @@ async def update_client_address(
     address_id: int,
     address: AddressUpdate,
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     return await update_address(db, id_client, address_id, address)
 
@@ -116,6 +143,6 @@ async def delete_client_address(
     client_id: int,
     address_id: int,
     db= Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     await delete_address(db, client_id, address_id)
\ No newline at end of file
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+from typing import Annotated
+from connectDB.database import engine
+from schemas.auth import CurrentUser
+from connectDB.pool import pool_status
+from dependencies import get_current_user, get_admin_user
+from services.auth import hash_pool
+from middleware import compression_stats
+from services.cache import cache_registry
+from services.invalidation import invalidation
+from services.profiler import profiler, PROFILER_ENABLED, PROFILER_MAX_SECONDS
+
+router = APIRouter()
+
+@router.get("/pool")
+async def read_pool_status(
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return pool_status(engine.pool)
+
+@router.get("/hashing")
+async def read_hashing_status(
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return hash_pool.stats()
+
+@router.get("/compression")
+async def read_compression_status(
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return compression_stats.stats()
+
+@router.get("/cache")
+async def read_cache_status(
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return {"caches": cache_registry.stats(), "invalidation": invalidation.stats()}
+
+@router.post("/profile", response_class=PlainTextResponse)
+async def run_profiler(
+    seconds: Annotated[float, Query(gt=0, le=PROFILER_MAX_SECONDS)] = 10,
+    route: str | None = None,
+    requests: Annotated[int, Query(gt=0, le=1000)] = 10,
+    current_user: CurrentUser = Depends(get_admin_user)
+):
+    """Amostra este worker por `seconds` segundos ou, com `route`, durante as
+    próximas `requests` requisições da rota (limitado a `seconds`).
+    Retorna as pilhas no formato "collapsed" (flamegraph.pl, speedscope)."""
+    if not PROFILER_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    session = await profiler.run(seconds, route, requests if route else 0)
+    return PlainTextResponse(
+        session.collapsed(),
+        headers={
+            "X-Profile-Samples": str(session.samples),
+            "X-Profile-Requests": str(session.profiled_requests),
+        }
+    )
@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from typing import Annotated
+from connectDB.database import engine
+from connectDB.pool import pool_status, checkout_wait
+from services.auth import hash_pool
+from services.cache import cache_registry
+from middleware import compression_stats
+from metrics import MetricsWriter, request_metrics, orders_created, METRICS_TOKEN
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def read_metrics(
+    authorization: Annotated[str | None, Header()] = None
+):
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token")
+
+    writer = MetricsWriter()
+
+    # Rotas
+    writer.family("http_request_duration_seconds", "histogram", "Latência das requisições por router")
+    for (router_name, method), histogram in sorted(request_metrics.durations.items()):
+        writer.histogram(
+            "http_request_duration_seconds", histogram.snapshot(),
+            {"router": router_name, "method": method}
+        )
+    writer.family("http_responses_total", "counter", "Respostas por router e classe de status")
+    for (router_name, status_class), count in sorted(request_metrics.responses.items()):
+        writer.sample("http_responses_total", count, {"router": router_name, "status": status_class})
+    writer.family("http_requests_in_flight", "gauge", "Requisições em andamento por router")
+    for router_name, count in sorted(request_metrics.in_flight.items()):
+        writer.sample("http_requests_in_flight", count, {"router": router_name})
+
+    # Pool de conexões
+    pool = pool_status(engine.pool)
+    writer.family("db_pool_connections", "gauge", "Conexões do pool por estado")
+    for state in ("size", "checked_out", "idle", "overflow"):
+        writer.sample("db_pool_connections", pool[state], {"state": state})
+    writer.family("db_pool_checkout_wait_seconds", "histogram", "Espera por uma conexão do pool")
+    writer.histogram("db_pool_checkout_wait_seconds", checkout_wait.snapshot())
+
+    # bcrypt
+    hashing = hash_pool.stats()
+    writer.family("auth_hash_in_flight", "gauge", "Operações bcrypt em execução ou na fila")
+    writer.sample("auth_hash_in_flight", hashing["in_flight"])
+    writer.family("auth_hash_queue_depth", "gauge", "Operações bcrypt aguardando uma thread")
+    writer.sample("auth_hash_queue_depth", hashing["queue_depth"])
+    writer.family("auth_hash_rejected_total", "counter", "Operações bcrypt rejeitadas com 503")
+    writer.sample("auth_hash_rejected_total", hashing["rejected"])
+
+    # Caches em memória
+    caches = cache_registry.stats()
+    for name, help_text, key in (
+        ("cache_hits_total", "Acertos do cache", "hits"),
+        ("cache_misses_total", "Falhas do cache", "misses"),
+        ("cache_evictions_total", "Remoções por limite de tamanho", "evictions"),
+    ):
+        writer.family(name, "counter", help_text)
+        for cache, stats in caches.items():
+            writer.sample(name, stats[key], {"cache": cache})
+    writer.family("cache_hit_ratio", "gauge", "Proporção de acertos do cache")
+    for cache, stats in caches.items():
+        writer.sample("cache_hit_ratio", stats["hit_ratio"], {"cache": cache})
+    writer.family("cache_entries", "gauge", "Entradas no cache")
+    for cache, stats in caches.items():
+        writer.sample("cache_entries", stats["size"], {"cache": cache})
+
+    # Compressão
+    compression = compression_stats.stats()
+    writer.family("http_compression_bytes_total", "counter", "Bytes antes (in) e depois (out) da compressão")
+    for encoding, counters in compression["encodings"].items():
+        writer.sample("http_compression_bytes_total", counters["bytes_in"], {"encoding": encoding, "direction": "in"})
+        writer.sample("http_compression_bytes_total", counters["bytes_out"], {"encoding": encoding, "direction": "out"})
+
+    # Pedidos
+    writer.family("orders_created_total", "counter", "Pedidos criados")
+    writer.sample("orders_created_total", orders_created.value)
+
+    return PlainTextResponse(writer.render(), media_type="text/plain; version=0.0.4")
@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
-from typing import Annotated, Optional
+from fastapi import APIRouter, Body, Depends, Query, HTTPException, status
+from fastapi.responses import StreamingResponse
+from typing import Annotated, Any, Literal, Optional
 from datetime import datetime
-from schemas.orders import Order, OrderCreate, OrderUpdate
+from schemas.orders import Order, OrderList, OrderCreate, OrderUpdate, OrderCancellation, OrderBatchResult
 from services.orders import (
     get_orders,
     create_order,
+    create_orders_batch,
     get_order,
     update_order,
-    delete_order
+    delete_order,
+    order_cursor,
+    ORDER_RELATIONS
 )
+from services.serialization import json_list_response, sparse_fieldset
+from services.order_export import export_orders_ndjson, export_orders_csv
 from dependencies import get_db, get_current_user
-from connectDB.database import Usuario
+from schemas.auth import CurrentUser
 
 router = APIRouter()
 
@@ -24,32 +30,78 @@ async def list_orders(
     order_id: Optional[int] = None,
     status: Optional[str] = None,
     client_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Annotated[Optional[str], Query(description="Campos retornados, separados por vírgula")] = None,
+    expand: Annotated[Optional[str], Query(description="Relacionamentos carregados (items, items.product, items.product.images)")] = None,
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return await get_orders(
+    expanded, include, exclude = sparse_fieldset(Order, ORDER_RELATIONS, fields, expand)
+    orders = await get_orders(
         db, skip, limit, 
         start_date, end_date, 
         category, order_id, 
-        status, client_id
+        status, client_id,
+        cursor=cursor,
+        expand=expanded
+    )
+    # Cursor da próxima página (apenas quando a página veio cheia)
+    next_cursor = order_cursor(orders[-1]) if orders and len(orders) == limit else None
+    return json_list_response(OrderList, orders, next_cursor, include, exclude)
+
+@router.get("/export")
+async def export_orders(
+    file_format: Annotated[Literal["ndjson", "csv"], Query(alias="format")] = "ndjson",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    category: Optional[int] = None,
+    order_id: Optional[int] = None,
+    status: Optional[str] = None,
+    client_id: Optional[int] = None,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    filters = {
+        "start_date": start_date, "end_date": end_date,
+        "category": category, "order_id": order_id,
+        "status": status, "client_id": client_id,
+    }
+    if file_format == "csv":
+        return StreamingResponse(
+            export_orders_csv(filters),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="orders.csv"'}
+        )
+    return StreamingResponse(
+        export_orders_ndjson(filters),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="orders.ndjson"'}
     )
 
 @router.post("/", response_model=Order, status_code=status.HTTP_201_CREATED)
 async def add_order(
     order: OrderCreate, 
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
     
 ):
     return await create_order(db, order, current_user.id)
     # return await create_order(db, order, 1)  # Temporarily using 1 as user ID for testing
     
+@router.post("/batch", response_model=list[OrderBatchResult])
+async def add_orders_batch(
+    # Cada pedido é validado no serviço: um pedido inválido vira erro no seu índice, sem 422 do lote
+    orders: Annotated[list[Any], Body(description="Pedidos no formato de POST /orders/")],
+    db=Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    return await create_orders_batch(db, orders, current_user.id)
+
 
 @router.get("/{id}", response_model=Order)
 async def read_order(
     id: int,
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     order = await get_order(db, id)
     if not order:
@@ -61,14 +113,14 @@ async def edit_order(
     id: int, 
     order: OrderUpdate, 
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     return await update_order(db, id, order)
 
-@router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{id}", response_model=OrderCancellation)
 async def remove_order(
     id: int, 
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    await delete_order(db, id)
\ No newline at end of file
+    return await delete_order(db, id)
\ No newline at end of file
@@ -1,18 +1,27 @@
-from fastapi import APIRouter, Depends, Query, HTTPException, status
-from typing import Annotated, Optional
-from schemas.products import Product, ProductCreate, ProductUpdate
+from fastapi import APIRouter, Depends, Query, Header, HTTPException, Response, UploadFile, status
+from typing import Annotated, Literal, Optional
+from schemas.products import Product, ProductList, ProductCreate, ProductUpdate, ProductImportResult
 from services.products import (
     get_products,
     create_product,
     get_product,
     update_product,
-    delete_product
+    delete_product,
+    product_cursor,
+    product_etag,
+    get_product_etag,
+    PRODUCT_RELATIONS
 )
+from services.product_import import import_products
+from services.serialization import json_list_response, sparse_fieldset
+from services.http_cache import cache_control, cache_headers, etag_matches, not_modified
 from dependencies import get_db, get_current_user
-from connectDB.database import Usuario
+from schemas.auth import CurrentUser
 
 router = APIRouter()
 
+CACHE_CONTROL = cache_control("products")
+
 @router.get("/", response_model=list[Product])
 async def list_products(
     skip: Annotated[int, Query(ge=0)] = 0,
@@ -21,31 +30,62 @@ async def list_products(
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
     in_stock: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    fields: Annotated[Optional[str], Query(description="Campos retornados, separados por vírgula")] = None,
+    expand: Annotated[Optional[str], Query(description="Relacionamentos carregados (images)")] = None,
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
-    return await get_products(
+    expanded, include, exclude = sparse_fieldset(Product, PRODUCT_RELATIONS, fields, expand)
+    products = await get_products(
         db, skip, limit, 
-        category, min_price, max_price, in_stock
+        category, min_price, max_price, in_stock,
+        cursor=cursor,
+        expand=expanded
     )
+    # Cursor da próxima página (apenas quando a página veio cheia)
+    next_cursor = product_cursor(products[-1]) if products and len(products) == limit else None
+    return json_list_response(ProductList, products, next_cursor, include, exclude)
 
 @router.post("/", response_model=Product, status_code=status.HTTP_201_CREATED)
 async def add_product(
     product: ProductCreate, 
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     return await create_product(db, product)
 
+@router.post("/import", response_model=ProductImportResult)
+async def import_products_file(
+    file: UploadFile,
+    file_format: Annotated[Optional[Literal["csv", "ndjson"]], Query(alias="format")] = None,
+    db=Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    # Sem formato explícito, decide pela extensão do arquivo
+    if file_format is None:
+        filename = (file.filename or "").lower()
+        file_format = "ndjson" if filename.endswith((".ndjson", ".jsonl")) else "csv"
+    return await import_products(db, file.file, file_format)
+
 @router.get("/{id}", response_model=Product)
 async def read_product(
     id: int,
+    response: Response,
+    if_none_match: Annotated[Optional[str], Header()] = None,
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)    
+    current_user: CurrentUser = Depends(get_current_user)    
 ):
+    # Revalidação: compara só atualizado_em, sem carregar imagens nem serializar
+    if if_none_match:
+        etag = await get_product_etag(db, id)
+        if etag and etag_matches(if_none_match, etag):
+            return not_modified(etag, CACHE_CONTROL)
+
     product = await get_product(db, id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
+    response.headers.update(cache_headers(product_etag(product.id, product.updated_at), CACHE_CONTROL))
     return product
 
 @router.put("/{id}", response_model=Product)
@@ -53,7 +93,7 @@ async def edit_product(
     id: int, 
     product: ProductUpdate, 
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     return await update_product(db, id, product)
 
@@ -61,6 +101,6 @@ async def edit_product(
 async def remove_product(
     id: int, 
     db=Depends(get_db),
-    current_user: Usuario = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user)
 ):
     await delete_product(db, id)
\ No newline at end of file
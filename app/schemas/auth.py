@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, ConfigDict
 
 class Token(BaseModel):
     access_token: str
@@ -30,4 +30,14 @@ class UserOut(BaseModel):
     ativo: bool
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+class CurrentUser(BaseModel):
+    """Usuário autenticado: cópia imutável dos dados do usuário, sem vínculo com a sessão do banco"""
+    id: int
+    email: str
+    nome: str | None = None
+    ativo: bool | None = None
+
+    model_config = ConfigDict(frozen=True, from_attributes=True)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from datetime import datetime
 
 class CategoryBase(BaseModel):
@@ -21,4 +21,6 @@ class Category(CategoryBase):
 
     class Config:
         from_attributes = True
-        
\ No newline at end of file
+
+# Adapter reutilizado pela listagem de categorias (construído uma única vez)
+CategoryList = TypeAdapter(list[Category])
@@ -1,6 +1,7 @@
 from datetime import datetime, date
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, TypeAdapter
 from typing import List, Optional
+from schemas.imports import ImportRowError
 
 
 # Schemas para Endereço
@@ -19,8 +20,15 @@ class AddressBase(BaseModel):
         from_attributes=True
     )
 
+# Limites das colunas de enderecos aplicados só na entrada: o schema de
+# resposta continua aceitando registros gravados antes da validação
 class AddressCreate(AddressBase):
-    pass
+    street: str = Field(..., alias="logradouro", max_length=100)
+    number: str = Field(..., alias="numero", max_length=20)
+    complement: Optional[str] = Field(None, alias="complemento", max_length=50)
+    neighborhood: str = Field(..., alias="bairro", max_length=50)
+    city: str = Field(..., alias="cidade", max_length=50)
+    zip_code: str = Field(..., alias="cep", max_length=9)
 
 class Address(AddressBase):
     id: int
@@ -56,6 +64,7 @@ class ClientBase(BaseModel):
     )
 
 class ClientCreate(ClientBase):
+    email: EmailStr = Field(..., max_length=100)
     addresses: List[AddressCreate] = Field(alias="enderecos",default_factory=list)
 
 class ClientUpdate(BaseModel):
@@ -78,7 +87,12 @@ class Client(ClientBase):
     addresses: List[Address] = Field(alias="enderecos",default_factory=list)
     class Config:
         from_attributes = True
-        
-
 
+# Adapter reutilizado pela listagem de clientes (construído uma única vez)
+ClientList = TypeAdapter(List[Client])
 
+class ClientImportResult(BaseModel):
+    received: int
+    inserted: int
+    rejected: int
+    errors: List[ImportRowError] = []
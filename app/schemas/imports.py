@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+# Linha rejeitada em uma importação em massa (produtos, clientes)
+class ImportRowError(BaseModel):
+    line: int
+    error: str
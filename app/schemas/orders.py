@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import List, Optional
 from enum import Enum
 from schemas.products import Product
@@ -30,7 +30,7 @@ class OrderItemCreate(OrderItemBase):
 class OrderItem(OrderItemBase):
     id: int = Field(..., description="ID do item do pedido")
     total: float = Field(..., ge=0, alias="total_item", description="Total do item (quantidade x preço unitário - desconto)")
-    product: Product = Field(..., alias="produto", description="Produto relacionado")
+    product: Optional[Product] = Field(None, alias="produto", description="Produto relacionado (omitido quando não expandido)")
 
     class Config:
         from_attributes = True
@@ -50,6 +50,20 @@ class OrderUpdate(BaseModel):
     payment_method: Optional[PaymentMethod] = Field(None, alias="metodo_pagamento", description="Método de pagamento")
     shipping_address: Optional[str] = Field(None, alias="endereco_entrega", description="Endereço de entrega")
 
+class OrderBatchResult(BaseModel):
+    index: int = Field(..., description="Posição do pedido no lote enviado")
+    success: bool = Field(..., description="Indica se o pedido foi criado")
+    order_id: Optional[int] = Field(None, description="ID do pedido criado")
+    error: Optional[str] = Field(None, description="Motivo da falha, quando houver")
+
+class ProductStock(BaseModel):
+    product_id: int = Field(..., description="ID do produto")
+    stock: int = Field(..., description="Estoque do produto após a operação")
+
+class OrderCancellation(BaseModel):
+    message: str = Field(..., description="Resultado do cancelamento")
+    products: List[ProductStock] = Field(default_factory=list, description="Estoque atualizado dos produtos do pedido")
+
 class Order(OrderBase):
     id: int = Field(..., description="ID do pedido")
     user_id: int = Field(..., alias="usuario_id", description="ID do usuário")
@@ -62,4 +76,10 @@ class Order(OrderBase):
     items: List[OrderItem] = Field(..., alias="itens", description="Itens do pedido")
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+# Adapter reutilizado pela listagem de pedidos (construído uma única vez)
+OrderList = TypeAdapter(List[Order])
+
+# Validação individual dos pedidos de POST /orders/batch
+OrderCreateAdapter = TypeAdapter(OrderCreate)
@@ -1,7 +1,8 @@
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, TypeAdapter
 from typing import Optional, List
 from enum import Enum
+from schemas.imports import ImportRowError
 
 
 class ImageBase(BaseModel):
@@ -18,6 +19,11 @@ class Image(ImageBase):
         from_attributes = True
  
 
+# Limites das colunas: NUMERIC(10, 2) e INTEGER
+MAX_SALE_PRICE = 99_999_999.99
+MAX_INTEGER = 2_147_483_647
+
+
 class ProductBase(BaseModel):
     name: str = Field(..., alias="nome")
     description: str = Field(..., alias="descricao")
@@ -29,18 +35,35 @@ class ProductBase(BaseModel):
     expiry_date: Optional[datetime] = Field(None, alias="data_validade")
     status: bool = Field(True, alias="ativo")
 
-class ProductCreate(ProductBase):
+# Limites aplicados só na entrada (criação e importação): o schema de resposta
+# continua aceitando registros gravados antes da validação
+class ProductInput(ProductBase):
+    name: str = Field(..., alias="nome", max_length=100)
+    description: str = Field(..., alias="descricao", max_length=200)
+    sale_price: float = Field(..., alias="valor_venda", ge=0, le=MAX_SALE_PRICE, allow_inf_nan=False)
+    barcode: Optional[str] = Field(None, alias="codigo_barras", max_length=50)
+    stock: int = Field(0, alias="estoque", ge=0, le=MAX_INTEGER)
+    min_stock: int = Field(5, alias="estoque_minimo", ge=0, le=MAX_INTEGER)
+
+class ProductCreate(ProductInput):
     images: Optional[List[ImageBase]] = None
 
 class ProductUpdate(BaseModel):
-    name: Optional[str] | None = Field(None, alias="nome")
-    description: Optional[str] | None = Field(None, alias="descricao")
-    sale_price: Optional[float] | None = Field(None, alias="valor_venda")
-    stock: Optional[int] | None = Field(None, alias="estoque")
-    min_stock: Optional[int] | None = Field(5, alias="estoque_minimo")
+    name: Optional[str] | None = Field(None, alias="nome", max_length=100)
+    description: Optional[str] | None = Field(None, alias="descricao", max_length=200)
+    sale_price: Optional[float] | None = Field(None, alias="valor_venda", ge=0, le=MAX_SALE_PRICE, allow_inf_nan=False)
+    stock: Optional[int] | None = Field(None, alias="estoque", ge=0, le=MAX_INTEGER)
+    min_stock: Optional[int] | None = Field(5, alias="estoque_minimo", ge=0, le=MAX_INTEGER)
     status: Optional[bool] | None = Field(None, alias="ativo")
     expiry_date: Optional[datetime] = Field(None, alias="data_validade")
 
+class ProductImportResult(BaseModel):
+    received: int
+    inserted: int
+    updated: int
+    rejected: int
+    errors: List[ImportRowError] = []
+
 class Product(ProductBase):
     id: int
     created_at: datetime = Field(None, alias="criado_em")
@@ -49,3 +72,6 @@ class Product(ProductBase):
 
     class Config:
         from_attributes = True
+
+# Adapter reutilizado pela listagem de produtos (construído uma única vez)
+ProductList = TypeAdapter(List[Product])
@@ -0,0 +1,398 @@
+"""Gerador de massa de dados sintética para testes de carga.
+
+Gera clientes, endereços, categorias, produtos (com imagens), pedidos e itens
+referencialmente consistentes, com popularidade de produtos concentrada em
+poucos SKUs (Zipf) e sazonalidade nas datas dos pedidos (pico em novembro e
+dezembro, fins de semana e horário comercial). Os dados são gravados via COPY
+em blocos processados em paralelo, cada bloco em um processo e conexão próprios.
+
+A mesma semente, tamanho de bloco e --end-date geram exatamente os mesmos
+registros, independente da quantidade de processos.
+
+Uso (a partir da pasta app):
+    python -m scripts.generate_data --clients 1000000 --products 100000 --orders 10000000 --truncate
+    python -m scripts.generate_data --orders 50000 --seed 7 --end-date 2025-12-31 --workers 4
+"""
+from connectDB.database import engine, init_db, StatusPedido, MetodoPagamento
+from services.utilities import cpf_check_digit, CPF_WEIGHTS_1, CPF_WEIGHTS_2
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+from itertools import accumulate
+from bisect import bisect
+import argparse
+import asyncio
+import asyncpg
+import random
+import json
+import time
+import os
+
+COLUMNS = {
+    "categorias_produto": ["id", "nome", "descricao", "ativo", "criado_em", "atualizado_em"],
+    "produtos": [
+        "id", "nome", "descricao", "valor_venda", "codigo_barras", "categoria_id", "estoque",
+        "estoque_minimo", "data_validade", "ativo", "criado_em", "atualizado_em",
+    ],
+    "imagens_produto": ["id", "produto_id", "url", "ordem", "criado_em"],
+    "clientes": [
+        "id", "nome", "sobrenome", "email", "cpf", "telefone", "data_nascimento",
+        "ativo", "criado_em", "atualizado_em",
+    ],
+    "enderecos": [
+        "id", "cliente_id", "logradouro", "numero", "complemento", "bairro",
+        "cidade", "estado", "cep", "principal",
+    ],
+    "pedidos": [
+        "id", "cliente_id", "usuario_id", "status", "valor_total", "valor_desconto", "valor_frete",
+        "metodo_pagamento", "observacoes", "endereco_entrega", "data_entrega_prevista",
+        "criado_em", "atualizado_em",
+    ],
+    "itens_pedido": ["id", "pedido_id", "produto_id", "quantidade", "preco_unitario", "desconto", "total_item"],
+}
+
+# Ordem de TRUNCATE (dependentes primeiro)
+TABLES = [
+    "itens_pedido", "pedidos", "imagens_produto", "produtos",
+    "categorias_produto", "enderecos", "clientes",
+]
+
+# Ids dos registros filhos são derivados do id do pai (determinísticos em paralelo)
+MAX_IMAGES = 3
+MAX_ADDRESSES = 2
+MAX_ITEMS = 4
+
+# Concentração das vendas: expoente da distribuição de Zipf
+PRODUCT_SKEW = 1.1
+CLIENT_SKEW = 0.6
+
+# Peso das vendas por mês (jan..dez), dia da semana (seg..dom) e hora do dia
+MONTH_WEIGHTS = (0.8, 0.75, 0.9, 0.9, 1.0, 0.95, 1.0, 1.0, 0.95, 1.05, 1.6, 1.8)
+WEEKDAY_WEIGHTS = (1.0, 1.0, 1.0, 1.05, 1.15, 1.25, 0.9)
+HOUR_WEIGHTS = (
+    0.2, 0.1, 0.05, 0.05, 0.05, 0.1, 0.3, 0.6, 0.9, 1.0, 1.1, 1.3,
+    1.5, 1.4, 1.1, 1.0, 1.0, 1.1, 1.3, 1.6, 1.8, 1.7, 1.2, 0.6,
+)
+ITEM_COUNT_WEIGHTS = list(accumulate((50, 25, 15, 10)))
+PAYMENT_METHODS = [
+    (MetodoPagamento.PIX.name, 40), (MetodoPagamento.CARTAO_CREDITO.name, 35),
+    (MetodoPagamento.CARTAO_DEBITO.name, 10), (MetodoPagamento.BOLETO.name, 10),
+    (MetodoPagamento.DINHEIRO.name, 5),
+]
+PAYMENT_WEIGHTS = list(accumulate(weight for _, weight in PAYMENT_METHODS))
+
+FIRST_NAMES = [
+    "Ana", "Bruno", "Carla", "Daniel", "Eduarda", "Felipe", "Gabriela", "Henrique", "Isabela",
+    "Joao", "Julia", "Lucas", "Mariana", "Mateus", "Natalia", "Pedro", "Rafael", "Sofia", "Thiago", "Vitoria",
+]
+LAST_NAMES = [
+    "Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+    "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa",
+]
+CITIES = [
+    ("São Paulo", "SP"), ("Rio de Janeiro", "RJ"), ("Belo Horizonte", "MG"), ("Curitiba", "PR"),
+    ("Porto Alegre", "RS"), ("Salvador", "BA"), ("Recife", "PE"), ("Fortaleza", "CE"),
+    ("Brasília", "DF"), ("Goiânia", "GO"), ("Campinas", "SP"), ("Florianópolis", "SC"),
+]
+STREETS = ["Rua das Flores", "Avenida Brasil", "Rua XV de Novembro", "Rua São João", "Avenida Paulista",
+           "Rua da Paz", "Rua Sete de Setembro", "Avenida Atlântica", "Rua Direita", "Rua do Comércio"]
+NEIGHBORHOODS = ["Centro", "Jardim América", "Vila Nova", "Boa Vista", "Santa Cecília", "Bela Vista"]
+CATEGORIES = [
+    "Eletrônicos", "Informática", "Celulares", "Eletrodomésticos", "Móveis", "Decoração", "Cama e Banho",
+    "Esporte", "Brinquedos", "Livros", "Moda", "Calçados", "Beleza", "Saúde", "Alimentos", "Bebidas",
+    "Pet Shop", "Ferramentas", "Jardim", "Automotivo",
+]
+PRODUCT_NOUNS = ["Kit", "Conjunto", "Modelo", "Linha", "Edição", "Pacote"]
+PRODUCT_ADJECTIVES = ["Premium", "Básico", "Plus", "Pro", "Compacto", "Clássico", "Eco", "Max"]
+
+# Configuração compartilhada com os processos (definida em init_worker)
+CONFIG: dict = {}
+
+
+def make_cpf(number: int) -> str:
+    """CPF válido e único a partir de um número sequencial"""
+    digits = [int(c) for c in f"{number % 1_000_000_000:09d}"]
+    digits.append(cpf_check_digit(digits, CPF_WEIGHTS_1))
+    digits.append(cpf_check_digit(digits, CPF_WEIGHTS_2))
+    return "".join(map(str, digits))
+
+
+def zipf_cum_weights(size: int, exponent: float) -> list[float]:
+    """Pesos acumulados de Zipf: o item de posição k tem peso 1/k^exponent"""
+    return list(accumulate(1 / rank ** exponent for rank in range(1, size + 1)))
+
+
+def day_cum_weights(start: datetime, days: int) -> list[float]:
+    """Pesos acumulados por dia: sazonalidade mensal, dia da semana e crescimento ao longo do período"""
+    weights = []
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        growth = 1 + 0.5 * offset / max(days, 1)
+        weights.append(MONTH_WEIGHTS[day.month - 1] * WEEKDAY_WEIGHTS[day.weekday()] * growth)
+    return list(accumulate(weights))
+
+
+def pick(rng: random.Random, cum_weights: list[float]) -> int:
+    """Índice sorteado segundo os pesos acumulados"""
+    return bisect(cum_weights, rng.random() * cum_weights[-1])
+
+
+def primary_address(client_id: int) -> tuple:
+    """Endereço principal derivado do id: o mesmo no cadastro e nos pedidos do cliente"""
+    city, state = CITIES[client_id * 7 % len(CITIES)]
+    return (
+        STREETS[client_id % len(STREETS)], str(client_id % 2000 + 1),
+        NEIGHBORHOODS[client_id % len(NEIGHBORHOODS)], city, state, f"{client_id * 7919 % 100_000_000:08d}",
+    )
+
+
+def address_text(client_id: int) -> str:
+    street, number, neighborhood, city, state, _ = primary_address(client_id)
+    return f"{street}, {number} - {neighborhood} - {city}/{state}"
+
+
+def category_rows(config: dict) -> dict:
+    created_at = config["start"]
+    rows = []
+    for id in range(1, config["sizes"]["categories"] + 1):
+        base = CATEGORIES[(id - 1) % len(CATEGORIES)]
+        name = base if id <= len(CATEGORIES) else f"{base} {id}"
+        rows.append((id, name, f"Produtos de {base.lower()}", True, created_at, created_at))
+    return {"categorias_produto": rows}
+
+
+def product_rows(rng: random.Random, start: int, end: int) -> dict:
+    config = CONFIG
+    products, images = [], []
+    for id in range(start, end):
+        created_at = config["start"] + timedelta(days=rng.randrange(config["days"]))
+        expiry_date = created_at + timedelta(days=rng.randint(90, 720)) if rng.random() < 0.2 else None
+        stock = config["stock"] if config["stock"] is not None else rng.randint(0, 500)
+        name = f"{rng.choice(PRODUCT_NOUNS)} {rng.choice(PRODUCT_ADJECTIVES)} {id}"
+        products.append((
+            id, name, f"{name} - descrição sintética", Decimal(config["prices"][id - 1]) / 100,
+            f"789{id:010d}", rng.randint(1, config["sizes"]["categories"]), stock, 5,
+            expiry_date, rng.random() >= config["inactive"], created_at, created_at,
+        ))
+        for order in range(rng.randint(1, MAX_IMAGES)):
+            images.append((
+                (id - 1) * MAX_IMAGES + order + 1, id,
+                f"https://cdn.example.com/produtos/{id}/{order + 1}.jpg", order + 1, created_at,
+            ))
+    return {"produtos": products, "imagens_produto": images}
+
+
+def client_rows(rng: random.Random, start: int, end: int) -> dict:
+    config = CONFIG
+    clients, addresses = [], []
+    for id in range(start, end):
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        created_at = config["start"] + timedelta(days=rng.randrange(config["days"]))
+        birth_date = datetime(1950, 1, 1) + timedelta(days=rng.randint(0, 365 * 57))
+        clients.append((
+            id, first_name, last_name, f"{first_name.lower()}.{last_name.lower()}{id}@example.com",
+            make_cpf(id), f"({rng.randint(11, 99)}) 9{rng.randint(1000, 9999)}-{rng.randint(1000, 9999)}",
+            birth_date, rng.random() < 0.97, created_at, created_at,
+        ))
+
+        street, number, neighborhood, city, state, zip_code = primary_address(id)
+        addresses.append(((id - 1) * MAX_ADDRESSES + 1, id, street, number, None,
+                          neighborhood, city, state, zip_code, True))
+        if rng.random() < 0.3:
+            city, state = rng.choice(CITIES)
+            addresses.append((
+                (id - 1) * MAX_ADDRESSES + 2, id, rng.choice(STREETS), str(rng.randint(1, 2000)),
+                "Apto " + str(rng.randint(1, 300)), rng.choice(NEIGHBORHOODS), city, state,
+                f"{rng.randint(1_000_000, 99_999_999):08d}", False,
+            ))
+    return {"clientes": clients, "enderecos": addresses}
+
+
+def order_status(rng: random.Random, age: timedelta) -> str:
+    """Status coerente com a idade do pedido"""
+    if rng.random() < 0.03:
+        return StatusPedido.CANCELADO.name
+    if age < timedelta(days=1):
+        return rng.choice((StatusPedido.PENDENTE.name, StatusPedido.PROCESSANDO.name))
+    if age < timedelta(days=7):
+        return rng.choice((StatusPedido.PROCESSANDO.name, StatusPedido.ENVIADO.name, StatusPedido.ENTREGUE.name))
+    return StatusPedido.ENTREGUE.name
+
+
+def order_rows(rng: random.Random, start: int, end: int) -> dict:
+    config = CONFIG
+    orders, items = [], []
+    ranking, prices = config["ranking"], config["prices"]
+    for id in range(start, end):
+        day = pick(rng, config["day_weights"])
+        hour = pick(rng, config["hour_weights"])
+        created_at = config["start"] + timedelta(
+            days=day, hours=hour, minutes=rng.randrange(60), seconds=rng.randrange(60)
+        )
+        client_id = pick(rng, config["client_weights"]) + 1
+
+        # SKUs distintos, sorteados pela popularidade
+        product_ids = set()
+        count = pick(rng, ITEM_COUNT_WEIGHTS) + 1
+        while len(product_ids) < min(count, len(ranking)):
+            product_ids.add(ranking[pick(rng, config["product_weights"])])
+
+        total = Decimal("0.00")
+        for index, product_id in enumerate(sorted(product_ids)):
+            quantity = rng.choices((1, 2, 3), weights=(70, 20, 10))[0]
+            unit_price = Decimal(prices[product_id - 1]) / 100
+            discount = (unit_price * quantity * Decimal("0.1")).quantize(Decimal("0.01")) if rng.random() < 0.1 else Decimal("0.00")
+            item_total = unit_price * quantity - discount
+            total += item_total
+            items.append(((id - 1) * MAX_ITEMS + index + 1, id, product_id, quantity, unit_price, discount, item_total))
+
+        shipping = Decimal("0.00") if total >= 200 else Decimal(rng.choice((1500, 2290, 3490))) / 100
+        status = order_status(rng, config["end"] - created_at)
+        updated_at = created_at + timedelta(days=rng.randint(0, 5)) if status != StatusPedido.PENDENTE.name else created_at
+        orders.append((
+            id, client_id, config["user_id"], status, total + shipping, Decimal("0.00"), shipping,
+            PAYMENT_METHODS[pick(rng, PAYMENT_WEIGHTS)][0],
+            "Entregar em horário comercial" if rng.random() < 0.05 else None,
+            address_text(client_id), created_at + timedelta(days=7), created_at, min(updated_at, config["end"]),
+        ))
+    return {"pedidos": orders, "itens_pedido": items}
+
+
+GENERATORS = {
+    "products": product_rows,
+    "clients": client_rows,
+    "orders": order_rows,
+}
+
+
+def init_worker(config: dict):
+    CONFIG.update(config)
+
+
+async def copy_tables(dsn: str, tables: dict) -> int:
+    conn = await asyncpg.connect(dsn)
+    try:
+        # Carga em massa: não espera o flush do WAL a cada commit
+        await conn.execute("SET synchronous_commit = off")
+        async with conn.transaction():
+            for table, records in tables.items():
+                if records:
+                    await conn.copy_records_to_table(table, records=records, columns=COLUMNS[table])
+    finally:
+        await conn.close()
+    return sum(len(records) for records in tables.values())
+
+
+def run_chunk(kind: str, start: int, end: int) -> int:
+    """Gera e grava um bloco (executado em um processo do pool)"""
+    # Semente por bloco: o conteúdo não depende de qual processo o executa
+    rng = random.Random(f"{CONFIG['seed']}:{kind}:{start}")
+    tables = GENERATORS[kind](rng, start, end)
+    return asyncio.run(copy_tables(CONFIG["dsn"], tables))
+
+
+def database_url() -> str:
+    return engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+async def generate(
+    sizes: dict,
+    seed: int = 42,
+    workers: int | None = None,
+    chunk_size: int = 50_000,
+    days: int = 730,
+    end_date: datetime | None = None,
+    stock: int | None = None,
+    inactive: float = 0.05,
+    truncate: bool = False,
+    log=print,
+) -> dict:
+    """Gera a massa de dados. `sizes`: categories, products, clients, orders"""
+    await init_db()
+    # Os processos do pool não devem herdar conexões abertas do engine
+    await engine.dispose()
+    dsn = database_url()
+    end = end_date or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    start = end - timedelta(days=days)
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        if truncate:
+            await conn.execute(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE")
+        elif await conn.fetchval("SELECT EXISTS (SELECT 1 FROM produtos) OR EXISTS (SELECT 1 FROM pedidos)"):
+            raise SystemExit("Tables already have data: use --truncate to replace them")
+        user_id = await conn.fetchval("SELECT id FROM usuarios ORDER BY id LIMIT 1")
+    finally:
+        await conn.close()
+
+    # Dados globais, calculados uma vez e enviados a cada processo
+    rng = random.Random(f"{seed}:global")
+    ranking = list(range(1, sizes["products"] + 1))
+    rng.shuffle(ranking)
+    config = {
+        "dsn": dsn, "seed": seed, "sizes": sizes, "start": start, "end": end, "days": days,
+        "user_id": user_id, "stock": stock, "inactive": inactive, "ranking": ranking,
+        "prices": [rng.randint(500, 50_000) for _ in range(sizes["products"])],
+        "product_weights": zipf_cum_weights(sizes["products"], PRODUCT_SKEW),
+        "client_weights": zipf_cum_weights(sizes["clients"], CLIENT_SKEW),
+        "day_weights": day_cum_weights(start, days),
+        "hour_weights": list(accumulate(HOUR_WEIGHTS)),
+    }
+
+    rows = {"categories": await copy_tables(dsn, category_rows(config))}
+    began = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=init_worker, initargs=(config,)) as pool:
+        # Produtos e clientes antes dos pedidos (chaves estrangeiras)
+        for phase in (("products", "clients"), ("orders",)):
+            phase_began = time.perf_counter()
+            jobs = [
+                loop.run_in_executor(pool, run_chunk, kind, chunk, min(chunk + chunk_size, sizes[kind] + 1))
+                for kind in phase
+                for chunk in range(1, sizes[kind] + 1, chunk_size)
+            ]
+            counts = await asyncio.gather(*jobs)
+            for kind in phase:
+                rows[kind] = sizes[kind]
+            log(f"{', '.join(phase)}: {sum(counts)} rows in {time.perf_counter() - phase_began:.1f}s")
+
+    conn = await asyncpg.connect(dsn)
+    try:
+        # Ids gravados explicitamente: ajusta as sequências
+        for table in TABLES:
+            await conn.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT max(id) FROM {table}), 0) + 1, false)"
+            )
+        await conn.execute(f"ANALYZE {', '.join(TABLES)}")
+    finally:
+        await conn.close()
+
+    return {
+        "seed": seed, "chunk_size": chunk_size, "end_date": end.date().isoformat(), "days": days,
+        "rows": rows, "seconds": round(time.perf_counter() - began, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera massa de dados sintética para testes de carga")
+    parser.add_argument("--categories", type=int, default=20)
+    parser.add_argument("--products", type=int, default=10_000)
+    parser.add_argument("--clients", type=int, default=100_000)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, help="Processos em paralelo (padrão: núcleos da máquina)")
+    parser.add_argument("--chunk-size", type=int, default=50_000, help="Registros por bloco de COPY")
+    parser.add_argument("--days", type=int, default=730, help="Período coberto pelos pedidos")
+    parser.add_argument("--end-date", type=datetime.fromisoformat, help="Data final dos pedidos (padrão: hoje)")
+    parser.add_argument("--stock", type=int, help="Estoque fixo para todos os produtos (padrão: aleatório)")
+    parser.add_argument("--inactive", type=float, default=0.05, help="Fração de produtos inativos")
+    parser.add_argument("--truncate", action="store_true", help="Apaga os dados existentes antes de gerar")
+    args = parser.parse_args()
+
+    summary = asyncio.run(generate(
+        {"categories": args.categories, "products": args.products, "clients": args.clients, "orders": args.orders},
+        seed=args.seed, workers=args.workers, chunk_size=args.chunk_size, days=args.days,
+        end_date=args.end_date, stock=args.stock, inactive=args.inactive, truncate=args.truncate,
+    ))
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
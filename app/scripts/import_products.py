@@ -0,0 +1,31 @@
+"""Importação de produtos em massa pela linha de comando.
+
+Uso (a partir da pasta app):
+    python -m scripts.import_products catalogo.csv
+    python -m scripts.import_products catalogo.ndjson --format ndjson
+"""
+import argparse
+import asyncio
+import json
+from connectDB.database import SessionLocal, engine
+from services.product_import import import_products
+
+
+async def main(path: str, file_format: str):
+    async with SessionLocal() as db:
+        with open(path, "rb") as file:
+            report = await import_products(db, file, file_format)
+    await engine.dispose()
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Importa produtos de um arquivo CSV ou NDJSON")
+    parser.add_argument("path", help="Arquivo com os produtos")
+    parser.add_argument("--format", dest="file_format", choices=["csv", "ndjson"])
+    args = parser.parse_args()
+
+    file_format = args.file_format
+    if file_format is None:
+        file_format = "ndjson" if args.path.lower().endswith((".ndjson", ".jsonl")) else "csv"
+    asyncio.run(main(args.path, file_format))
@@ -1,4 +1,5 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from connectDB.database import Endereco
 from schemas.clients import AddressCreate, AddressUpdate
 from services.utilities import remove_special_characters
@@ -10,7 +11,7 @@ from typing import List, Optional
 # get client_address 
 
 async def get_addresses(
-    db: Session, 
+    db: AsyncSession, 
     id_client: int,
     id_address: int | None = None,
     is_primary_address: bool | None = None
@@ -18,45 +19,32 @@ async def get_addresses(
     """Lista todos os endereços de um cliente"""
     
 
-    query = db.query(Endereco).filter(Endereco.cliente_id == id_client)
-    if not query:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Endereço do cliente não encontrado"
-        )
+    query = select(Endereco).filter(Endereco.cliente_id == id_client)
+
     # Aplica filtros opcionais
     if id_address is not None:
         query = query.filter(Endereco.id == id_address)
-        if not query:
-            raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Endereço não pertence ao cliente"
-            )
             
     # Verifica se é o endereço principal
     if is_primary_address is not None:
         query = query.filter(Endereco.principal == is_primary_address)
-        if not query:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Endereço Principal não encontrado"
-            )
 
-    return query
+    result = await db.execute(query)
+    return result.scalars().all()
 
 #___________________________________________________
 # post client_address 
 
 async def create_address(
-    db: Session, 
+    db: AsyncSession, 
     client_id: int, 
     address: AddressCreate
 ) -> Endereco:
     """Cria um novo endereço para o cliente"""
     # Se for o primeiro endereço, força como principal
-    existing_addresses = db.query(Endereco).filter(
-        Endereco.cliente_id == client_id
-    ).count()
+    existing_addresses = await db.scalar(
+        select(func.count(Endereco.id)).filter(Endereco.cliente_id == client_id)
+    )
     
     db_address = Endereco(
         cliente_id=client_id,
@@ -72,30 +60,33 @@ async def create_address(
     
     if address.is_primary:
         # Verifica se já existe um endereço principal
-        existing_primary = db.query(Endereco).filter(
-            Endereco.cliente_id == client_id,
-            Endereco.principal == True
-        ).first()
+        result = await db.execute(
+            select(Endereco).filter(
+                Endereco.cliente_id == client_id,
+                Endereco.principal == True
+            )
+        )
+        existing_primary = result.scalars().first()
         if existing_primary:
             existing_primary.principal = False
     
     db.add(db_address)
-    db.commit()
-    db.refresh(db_address)
+    await db.commit()
+    await db.refresh(db_address)
     
     return db_address
 
 #___________________________________________________
 # update client_address 
 async def update_address(
-    db: Session,
+    db: AsyncSession,
     client_id: int,
     address_id: int,
     address: AddressUpdate
 ) -> Endereco:
     """Atualiza um endereço do cliente"""
-    query = await get_addresses(db, client_id, address_id)
-    db_address = query.first()
+    addresses = await get_addresses(db, client_id, address_id)
+    db_address = addresses[0] if addresses else None
     
     # Verifica se o endereço existe
     if not db_address:
@@ -121,30 +112,34 @@ async def update_address(
     if address.is_primary is not None:
         if address.is_primary:
             # Desmarca todos os outros endereços principais do cliente
-            db.query(Endereco).filter(
-                Endereco.cliente_id == client_id,
-                Endereco.id != address_id
-            ).update({Endereco.principal: False})
+            await db.execute(
+                update(Endereco)
+                .filter(
+                    Endereco.cliente_id == client_id,
+                    Endereco.id != address_id
+                )
+                .values(principal=False)
+            )
             db_address.principal = True
         else:
             db_address.principal = False
         
-    db.commit()
-    db.refresh(db_address)
+    await db.commit()
+    await db.refresh(db_address)
     return db_address
 
 #___________________________________________________
 # delete client_address 
 async def delete_address(
-    db: Session,
+    db: AsyncSession,
     client_id: int,
     address_id: int
 ) -> None:
     """Remove um endereço do cliente"""
     
     # get 1 address
-    query = await get_addresses(db, client_id, address_id)
-    db_address = query.first()
+    addresses = await get_addresses(db, client_id, address_id)
+    db_address = addresses[0] if addresses else None
     if not db_address:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -152,7 +147,9 @@ async def delete_address(
         )
     
     # Verifica se é o último endereço
-    num_addresses = db.query(Endereco).filter(Endereco.cliente_id == client_id).count()
+    num_addresses = await db.scalar(
+        select(func.count(Endereco.id)).filter(Endereco.cliente_id == client_id)
+    )
     
     if num_addresses <= 1:
         raise HTTPException(
@@ -167,5 +164,5 @@ async def delete_address(
             detail="Não é possível remover o endereço principal. Defina outro como principal primeiro."
         )
 
-    db.delete(db_address)
-    db.commit()
\ No newline at end of file
+    await db.delete(db_address)
+    await db.commit()
\ No newline at end of file
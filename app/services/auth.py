@@ -1,11 +1,15 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+import asyncio
 import jwt
 from jwt.exceptions import InvalidTokenError
 from passlib.context import CryptContext
 from fastapi import HTTPException, status, Depends
 from connectDB.database import Usuario, Pedido
-from schemas.auth import TokenData, UserLogin, UserRegister
-from sqlalchemy.orm import Session
+from schemas.auth import TokenData, UserLogin, UserRegister, CurrentUser
+from services.cache import TTLCache, cache_registry
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
 
 # Configurações
@@ -13,29 +17,100 @@ SECRET_KEY = os.getenv("SECRET_KEY", "secret-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+# Cache de usuários autenticados (chave: "sub" do token)
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "1024"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))
+# Inclui id e status do usuário no token, dispensando a consulta ao banco.
+# Contrapartida: invalidate_user não alcança esses tokens, então um usuário
+# desativado continua autenticado até o token expirar. Por isso o access token
+# tem validade curta (JWT_EMBED_CLAIMS_EXPIRE_MINUTES) quando a opção está ativa;
+# a renovação pelo refresh token relê o usuário e já emite active=False.
+JWT_EMBED_CLAIMS = os.getenv("JWT_EMBED_CLAIMS", "false").lower() == "true"
+JWT_EMBED_CLAIMS_EXPIRE_MINUTES = int(os.getenv("JWT_EMBED_CLAIMS_EXPIRE_MINUTES", "5"))
+
+# E-mails com acesso às rotas administrativas (ex.: profiler), separados por vírgula
+ADMIN_EMAILS = {
+    email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()
+}
+
+# Threads dedicadas ao bcrypt e limite de operações aguardando na fila
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", "2"))
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", "64"))
+
+user_cache = cache_registry.register(
+    "users", TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+)
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
 
-def get_password_hash(password):
-    return pwd_context.hash(password)
+class HashPool:
+    """Executa o bcrypt fora do event loop, em um pool de threads limitado"""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.in_flight = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+
+    async def run(self, func, *args):
+        # Rejeita a operação quando a fila está cheia, em vez de acumular espera
+        if self.in_flight >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many authentication requests, try again later",
+                headers={"Retry-After": "1"},
+            )
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.in_flight -= 1
+
+    @property
+    def queue_depth(self) -> int:
+        return max(self.in_flight - self.workers, 0)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "rejected": self.rejected,
+        }
+
+
+hash_pool = HashPool(HASH_WORKERS, HASH_MAX_PENDING)
 
-async def authenticate_user(email: str, password: str, db: Session):
-    user = db.query(Usuario).filter(Usuario.email == email, Usuario.ativo == True).first()
-    if not user or not verify_password(password, user.senha_hash):
+async def verify_password(plain_password, hashed_password):
+    return await hash_pool.run(pwd_context.verify, plain_password, hashed_password)
+
+async def get_password_hash(password):
+    return await hash_pool.run(pwd_context.hash, password)
+
+async def authenticate_user(email: str, password: str, db: AsyncSession):
+    result = await db.execute(
+        select(Usuario).filter(Usuario.email == email, Usuario.ativo == True)
+    )
+    user = result.scalars().first()
+    if not user or not await verify_password(password, user.senha_hash):
         return None
     return user
 
-async def create_user(user: UserRegister, db: Session):
+async def create_user(user: UserRegister, db: AsyncSession):
     
     # Verifica se usuário já existe
-    db_user = db.query(Usuario).filter(Usuario.email == user.email).first()
+    result = await db.execute(select(Usuario).filter(Usuario.email == user.email))
+    db_user = result.scalars().first()
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
     db_user = Usuario(
         nome=user.name,
         email=user.email,
@@ -45,10 +120,38 @@ async def create_user(user: UserRegister, db: Session):
         atualizado_em=datetime.now(timezone.utc)
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
+def token_claims(user: Usuario) -> dict:
+    """Claims do access token (id e status apenas se JWT_EMBED_CLAIMS estiver ativo)"""
+    claims = {"sub": user.email}
+    if JWT_EMBED_CLAIMS:
+        claims.update({"uid": user.id, "active": bool(user.ativo)})
+    return claims
+
+def access_token_expires() -> timedelta:
+    """Validade do access token (limitada quando o token embute id e status)"""
+    if JWT_EMBED_CLAIMS:
+        return timedelta(minutes=min(ACCESS_TOKEN_EXPIRE_MINUTES, JWT_EMBED_CLAIMS_EXPIRE_MINUTES))
+    return timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+
+def cache_user(user: Usuario) -> CurrentUser:
+    """Guarda no cache uma cópia do usuário, nunca o objeto do ORM.
+
+    O objeto do ORM pertence à sessão da requisição: um rollback nessa sessão o
+    expira e as leituras seguintes vindas do cache falhariam, além de o cache
+    enxergar alterações ainda não confirmadas.
+    """
+    current_user = CurrentUser.model_validate(user)
+    user_cache.set(current_user.email, current_user)
+    return current_user
+
+async def invalidate_user(db: AsyncSession, email: str):
+    """Remove o usuário do cache de autenticação (em todos os workers) no commit de `db`"""
+    await cache_registry.invalidate(db, "users", email)
+
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
     to_encode = data.copy()
     if expires_delta:
@@ -65,7 +168,7 @@ def create_refresh_token(data: dict):
     encoded_jwt = jwt.encode(data, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def login_user(email: str, password: str, db: Session):
+async def login_user(email: str, password: str, db: AsyncSession):
     user = await authenticate_user(email, password, db)
     if not user:
         raise HTTPException(
@@ -74,12 +177,12 @@ async def login_user(email: str, password: str, db: Session):
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data=token_claims(user), expires_delta=access_token_expires()
     )
     
     refresh_token = create_refresh_token(data={"sub": user.email})
+    cache_user(user)
     
     return {
         "access_token": access_token,
@@ -87,7 +190,7 @@ async def login_user(email: str, password: str, db: Session):
         "refresh_token": refresh_token
     }
 
-async def refresh_token_access(refresh_token: str, db: Session):
+async def refresh_token_access(refresh_token: str, db: AsyncSession):
     try:
         payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -96,14 +199,14 @@ async def refresh_token_access(refresh_token: str, db: Session):
     except InvalidTokenError:
         raise HTTPException(status_code=400, detail="Invalid token")
     
-    user = db.query(Usuario).filter(Usuario.email == email).first()
+    result = await db.execute(select(Usuario).filter(Usuario.email == email))
+    user = result.scalars().first()
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     
     # new access token 
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     new_access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
+        data=token_claims(user), expires_delta=access_token_expires()
     )
     return {
         "access_token": new_access_token,
@@ -122,8 +225,9 @@ def verify_token(token: str):
         raise HTTPException(status_code=400, detail="Invalid token")
     
     
-async def get_user(db: Session):
-    db_user = db.query(Usuario).all()
+async def get_user(db: AsyncSession):
+    result = await db.execute(select(Usuario))
+    db_user = result.scalars().all()
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -134,32 +238,37 @@ async def get_user(db: Session):
         "ativo": user.ativo
     } for user in db_user]
 
-async def update_user(user_id: int, user_update: UserRegister, db: Session):
-    db_user = db.query(Usuario).filter(Usuario.id == user_id).first()
+async def update_user(user_id: int, user_update: UserRegister, db: AsyncSession):
+    result = await db.execute(select(Usuario).filter(Usuario.id == user_id))
+    db_user = result.scalars().first()
     
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    previous_email = db_user.email
+
     # Atualiza os campos
     db_user.nome = user_update.name if user_update.name is not None else db_user.nome
     db_user.email = user_update.email if user_update.email is not None else db_user.email
-    db_user.senha_hash = get_password_hash(user_update.password) if user_update.password is not None else db_user.senha_hash
+    db_user.senha_hash = await get_password_hash(user_update.password) if user_update.password is not None else db_user.senha_hash
     db_user.ativo = user_update.active if user_update.active is not None else db_user.ativo
     db_user.atualizado_em = datetime.now(timezone.utc)
     
-    db.commit()
-    db.refresh(db_user)
+    await invalidate_user(db, previous_email)
+    await db.commit()
+    await db.refresh(db_user)
     return {"detail": "User updated successfully", "user": db_user}
 
-async def delete_user(user_id: int, db: Session):
-    db_user = db.query(Usuario).filter(Usuario.id == user_id).first()
+async def delete_user(user_id: int, db: AsyncSession):
+    result = await db.execute(select(Usuario).filter(Usuario.id == user_id))
+    db_user = result.scalars().first()
     
     # Verifica se o usuário existe
     if not db_user:
         raise HTTPException(status_code=404, detail="User not found")
 
     # Conta quantos usuários existem no total
-    total_users = db.query(Usuario).count()
+    total_users = await db.scalar(select(func.count(Usuario.id)))
     
     if total_users <= 1:
         raise HTTPException(
@@ -168,15 +277,19 @@ async def delete_user(user_id: int, db: Session):
         )
     
     # Verifica se o usuário possui pedidos associados
-    has_orders = db.query(Pedido).filter(Pedido.usuario_id == user_id).first() is not None
+    has_orders = await db.scalar(
+        select(Pedido.id).filter(Pedido.usuario_id == user_id).limit(1)
+    ) is not None
 
     if has_orders:
         db_user.ativo = False
         db_user.atualizado_em = datetime.now(timezone.utc)
-        db.commit()
-        db.refresh(db_user)
+        await invalidate_user(db, db_user.email)
+        await db.commit()
+        await db.refresh(db_user)
         return {"detail": "User has orders. Marked as inactive."}
     else:
-        db.delete(db_user)
-        db.commit()
+        await invalidate_user(db, db_user.email)
+        await db.delete(db_user)
+        await db.commit()
         return {"detail": "User deleted successfully"}
\ No newline at end of file
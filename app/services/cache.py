@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Protocol
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+import time
+import os
+
+# Cache de leitura do catálogo (produtos e categorias)
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", "4096"))
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+
+
+class TTLCache:
+    """Cache LRU em memória com expiração por tempo (TTL)"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = item
+            if expires_at < now:
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            # Remove os itens menos usados quando o limite é atingido
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if (lookups := self.hits + self.misses) else None,
+        }
+
+
+class InvalidationBackend(Protocol):
+    """Backend compartilhado que propaga invalidações para os outros workers"""
+
+    async def publish(self, db: AsyncSession, name: str, keys: tuple) -> None: ...
+
+
+# Chave de session.info com as invalidações aguardando o commit
+PENDING_INVALIDATIONS = "cache_invalidations"
+
+
+class CacheRegistry:
+    """Caches nomeados do processo.
+
+    As escritas chamam invalidate(db, ...) antes do commit, na mesma sessão:
+    a invalidação é publicada dentro da transação (entregue aos demais workers
+    só se o commit acontecer) e a chave é removida do cache local logo depois
+    do commit. Um rollback descarta as invalidações pendentes.
+    """
+
+    def __init__(self):
+        self.caches: dict[str, TTLCache] = {}
+        self.backend: InvalidationBackend | None = None
+
+    def register(self, name: str, cache: TTLCache) -> TTLCache:
+        self.caches[name] = cache
+        return cache
+
+    def evict(self, name: str, keys: tuple = ()):
+        """Remove as chaves do cache local (sem chaves, limpa o cache inteiro)"""
+        cache = self.caches.get(name)
+        if cache is None:
+            return
+        if not keys:
+            cache.clear()
+        for key in keys:
+            cache.delete(key)
+
+    async def invalidate(self, db: AsyncSession, name: str, *keys):
+        db.info.setdefault(PENDING_INVALIDATIONS, []).append((name, keys))
+        if self.backend is not None:
+            await self.backend.publish(db, name, keys)
+
+    def stats(self) -> dict:
+        return {name: cache.stats() for name, cache in self.caches.items()}
+
+
+cache_registry = CacheRegistry()
+
+
+@event.listens_for(Session, "after_commit")
+def evict_after_commit(session: Session):
+    for name, keys in session.info.pop(PENDING_INVALIDATIONS, ()):
+        cache_registry.evict(name, keys)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_after_rollback(session: Session, previous_transaction):
+    session.info.pop(PENDING_INVALIDATIONS, None)
@@ -1,11 +1,20 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from connectDB.database import CategoriaProduto, Produto
-from schemas.categories import CategoryCreate, CategoryUpdate
+from schemas.categories import Category, CategoryCreate, CategoryUpdate
+from services.utilities import encode_cursor, decode_cursor
+from services.http_cache import weak_etag
+from services.cache import TTLCache, cache_registry, CATALOG_CACHE_SIZE, CATALOG_CACHE_TTL
 from datetime import datetime, timezone
 from fastapi import HTTPException, status
 
+# Categorias lidas por id (schema Category já validado), invalidadas nas escritas
+category_cache = cache_registry.register(
+    "categories", TTLCache(maxsize=CATALOG_CACHE_SIZE, ttl=CATALOG_CACHE_TTL)
+)
 
-def create_category_service(db: Session, category_data: CategoryCreate):
+
+async def create_category_service(db: AsyncSession, category_data: CategoryCreate):
     """Cria uma nova categoria no banco de dados"""
     db_category = CategoriaProduto(
         nome=category_data.name,
@@ -15,22 +24,56 @@ def create_category_service(db: Session, category_data: CategoryCreate):
         atualizado_em=datetime.now(timezone.utc)
     )
     db.add(db_category)
-    db.commit()
-    db.refresh(db_category)
+    await db.commit()
+    await db.refresh(db_category)
     return db_category
 
-def get_categories_service(db: Session, skip: int = 0, limit: int = 100, active: bool | None = None):
-    """Lista categorias com paginação e filtros"""
-    query = db.query(CategoriaProduto)
+async def get_categories_service(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    active: bool | None = None,
+    cursor: str | None = None
+):
+    """Lista categorias com paginação (cursor ou offset) e filtros"""
+    query = select(CategoriaProduto)
     
     if active is not None:
         query = query.filter(CategoriaProduto.ativo == active)
         
-    return query.offset(skip).limit(limit).all()
+    query = query.order_by(CategoriaProduto.id)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.filter(CategoriaProduto.id > last_id)
+    else:
+        query = query.offset(skip)
+        
+    result = await db.execute(query.limit(limit))
+    return result.scalars().all()
+
+def categories_etag(
+    categories: list[CategoriaProduto],
+    skip: int = 0,
+    limit: int = 100,
+    active: bool | None = None,
+    cursor: str | None = None
+) -> str:
+    """ETag fraco da listagem a partir da página já consultada (id e atualizado_em de cada categoria)"""
+    return weak_etag(
+        "categorias", skip, limit, active, cursor,
+        *(
+            f"{category.id}:{category.atualizado_em.isoformat() if category.atualizado_em else ''}"
+            for category in categories
+        )
+    )
 
-def get_category_service(db: Session, category_id: int):
+def category_cursor(category: CategoriaProduto) -> str:
+    """Cursor da próxima página a partir da última categoria retornada"""
+    return encode_cursor(category.id)
+
+async def get_category_service(db: AsyncSession, category_id: int):
     """Obtém uma categoria específica por ID"""
-    category = db.query(CategoriaProduto).filter(CategoriaProduto.id == category_id).first()
+    category = await db.get(CategoriaProduto, category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -38,9 +81,22 @@ def get_category_service(db: Session, category_id: int):
         )
     return category
 
-def update_category_service(db: Session, id: int, category_update: CategoryUpdate):
+async def read_category_service(db: AsyncSession, category_id: int) -> Category:
+    """Obtém uma categoria para leitura, usando o cache do catálogo.
+
+    As escritas continuam usando get_category_service, que retorna o objeto do ORM.
+    """
+    cached = category_cache.get(category_id)
+    if cached is not None:
+        return cached
+
+    category = Category.model_validate(await get_category_service(db, category_id))
+    category_cache.set(category_id, category)
+    return category
+
+async def update_category_service(db: AsyncSession, id: int, category_update: CategoryUpdate):
     """Atualiza uma categoria existente"""
-    category = get_category_service(db, id)
+    category = await get_category_service(db, id)
 
     if category_update.name is not None:
         category.nome = category_update.name
@@ -48,25 +104,30 @@ def update_category_service(db: Session, id: int, category_update: CategoryUpdat
         category.descricao = category_update.description
     
     category.atualizado_em = datetime.now(timezone.utc)
-    db.commit()
-    db.refresh(category)
+    await cache_registry.invalidate(db, "categories", id)
+    await db.commit()
+    await db.refresh(category)
     return category
 
-def delete_category_service(db: Session, id: int):
+async def delete_category_service(db: AsyncSession, id: int):
     """Remove uma categoria (soft delete se tiver produtos associados)"""
-    category = get_category_service(db, id)
+    category = await get_category_service(db, id)
     
     # Verifica se existem produtos associados
-    has_products = db.query(Produto).filter(Produto.categoria_id == id).first() is not None
+    has_products = await db.scalar(
+        select(Produto.id).filter(Produto.categoria_id == id).limit(1)
+    ) is not None
     
     if has_products:
         # Soft delete
         category.ativo = False
         category.atualizado_em = datetime.now(timezone.utc)
-        db.commit()
+        await cache_registry.invalidate(db, "categories", id)
+        await db.commit()
         return {"message": "Categoria desativada (possui produtos associados)"}
     else:
         # Delete físico
-        db.delete(category)
-        db.commit()
+        await db.delete(category)
+        await cache_registry.invalidate(db, "categories", id)
+        await db.commit()
         return {"message": "Categoria removida permanentemente"}
\ No newline at end of file
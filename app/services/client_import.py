@@ -0,0 +1,169 @@
+from sqlalchemy import select, insert, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError, DBAPIError
+from starlette.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from connectDB.database import Cliente, Endereco
+from schemas.clients import ClientCreate
+from services.utilities import (
+    iter_upload_rows,
+    IMPORT_CHUNK_SIZE,
+    IMPORT_MAX_ERRORS,
+    format_validation_error,
+    remove_special_characters,
+    validate_cpfs,
+)
+from datetime import datetime, timezone
+from itertools import islice
+from typing import BinaryIO
+
+
+def address_rows(client: ClientCreate, client_id: int) -> list[dict]:
+    """Linhas de endereços do cliente, com um único endereço principal.
+
+    Segue a mesma regra de create_address: o primeiro endereço é principal e
+    cada novo endereço marcado como principal substitui o anterior.
+    """
+    if not client.addresses:
+        return []
+
+    primary = 0
+    for index, address in enumerate(client.addresses):
+        if address.is_primary:
+            primary = index
+
+    return [
+        {
+            "cliente_id": client_id,
+            "logradouro": address.street,
+            "numero": address.number,
+            "complemento": address.complement,
+            "bairro": address.neighborhood,
+            "cidade": address.city,
+            "estado": address.state,
+            "cep": remove_special_characters(address.zip_code),
+            "principal": index == primary,
+        }
+        for index, address in enumerate(client.addresses)
+    ]
+
+
+async def insert_clients(db: AsyncSession, clients: list[ClientCreate]):
+    """Insere os clientes e seus endereços em lote (dois INSERTs)"""
+    now = datetime.now(timezone.utc)
+    result = await db.execute(
+        insert(Cliente).returning(Cliente.id, sort_by_parameter_order=True),
+        [
+            {
+                "nome": client.first_name,
+                "sobrenome": client.last_name,
+                "email": client.email,
+                "cpf": client.cpf,
+                "telefone": client.phone,
+                "data_nascimento": client.birth_date,
+                "ativo": True,
+                "criado_em": now,
+                "atualizado_em": now,
+            }
+            for client in clients
+        ],
+    )
+    client_ids = result.scalars().all()
+
+    addresses = []
+    for client, client_id in zip(clients, client_ids):
+        addresses.extend(address_rows(client, client_id))
+    if addresses:
+        await db.execute(insert(Endereco), addresses)
+
+
+async def import_clients(db: AsyncSession, file: BinaryIO, file_format: str = "ndjson") -> dict:
+    """Importa clientes e endereços em massa, em blocos com inserts em lote"""
+    report = {"received": 0, "inserted": 0, "rejected": 0, "errors": []}
+    seen_emails: set[str] = set()
+    seen_cpfs: set[str] = set()
+
+    def reject(line_number: int, error: str):
+        report["rejected"] += 1
+        if len(report["errors"]) < IMPORT_MAX_ERRORS:
+            report["errors"].append({"line": line_number, "error": error})
+
+    rows = iter_upload_rows(file, file_format)
+    while True:
+        # Leitura do arquivo fora do event loop, um bloco por vez
+        chunk = await run_in_threadpool(lambda: list(islice(rows, IMPORT_CHUNK_SIZE)))
+        if not chunk:
+            break
+
+        # Validação de schema
+        parsed = []
+        for line_number, row, error in chunk:
+            report["received"] += 1
+            if error:
+                reject(line_number, error)
+                continue
+            try:
+                client = ClientCreate.model_validate(row)
+            except ValidationError as exc:
+                reject(line_number, format_validation_error(exc))
+                continue
+            client.cpf = remove_special_characters(client.cpf)
+            parsed.append((line_number, client))
+
+        if not parsed:
+            continue
+
+        # CPFs do bloco validados de uma vez
+        valid = validate_cpfs([client.cpf for _, client in parsed])
+
+        # Duplicados já cadastrados: uma consulta por bloco
+        emails = {client.email for _, client in parsed}
+        cpfs = {client.cpf for _, client in parsed}
+        result = await db.execute(
+            select(Cliente.email, Cliente.cpf).filter(
+                or_(Cliente.email.in_(emails), Cliente.cpf.in_(cpfs))
+            )
+        )
+        existing_emails, existing_cpfs = set(), set()
+        for email, cpf in result:
+            existing_emails.add(email)
+            existing_cpfs.add(cpf)
+
+        accepted = []
+        for (line_number, client), cpf_ok in zip(parsed, valid):
+            if not cpf_ok:
+                reject(line_number, "Invalid CPF")
+            elif client.email in existing_emails or client.email in seen_emails:
+                reject(line_number, "Email already registered")
+            elif client.cpf in existing_cpfs or client.cpf in seen_cpfs:
+                reject(line_number, "CPF already registered")
+            else:
+                seen_emails.add(client.email)
+                seen_cpfs.add(client.cpf)
+                accepted.append((line_number, client))
+
+        if not accepted:
+            continue
+
+        try:
+            await insert_clients(db, [client for _, client in accepted])
+            # Commit por bloco: uma falha no meio do arquivo preserva o que já foi importado
+            await db.commit()
+        except IntegrityError:
+            # Email/CPF gravado por outra requisição depois da checagem de duplicados:
+            # desfaz só este bloco e segue com o restante do arquivo
+            await db.rollback()
+            for line_number, _ in accepted:
+                reject(line_number, "Chunk rolled back: email or CPF registered concurrently")
+            continue
+        except DBAPIError as exc:
+            # Qualquer outra recusa do banco (ex.: DataError) também só descarta
+            # este bloco, para que o relatório do arquivo inteiro seja devolvido
+            await db.rollback()
+            error = f"Chunk rolled back: {type(exc.orig).__name__}"
+            for line_number, _ in accepted:
+                reject(line_number, error)
+            continue
+        report["inserted"] += len(accepted)
+
+    return report
@@ -1,24 +1,40 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from connectDB.database import Cliente, Endereco, Pedido
-from schemas.clients import ClientCreate, ClientUpdate, AddressCreate
+from schemas.clients import ClientCreate, ClientUpdate, AddressCreate, Address
 from services.address import get_addresses, create_address
-from services.utilities import remove_special_characters, validate_cpf
+from services.utilities import remove_special_characters, validate_cpf, encode_cursor, decode_cursor
+from services.serialization import load_options
 from datetime import datetime, timezone, date
 from fastapi import HTTPException, status
 
 from typing import List
 
+# Endereços de todos os clientes da página carregados em um único SELECT ... IN
+CLIENT_LOAD_OPTIONS = (selectinload(Cliente.enderecos),)
+
+# Relacionamentos que GET /clients/ pode expandir (?expand=addresses)
+CLIENT_RELATIONS = {
+    "addresses": (Cliente.enderecos, Address, {}),
+}
+
 async def get_clients(
-    db: Session, 
+    db: AsyncSession, 
     skip: int = 0, 
     limit: int = 100,
     name: str | None = None,
     email: str | None = None,
     active: bool | None = None,
-    city: str | None = None
+    city: str | None = None,
+    cursor: str | None = None,
+    expand: set[str] | None = None
 ):
-    """Lista clientes com filtros"""
-    query = db.query(Cliente)
+    """Lista clientes com filtros (paginação por cursor ou offset)"""
+    if expand is None:
+        query = select(Cliente).options(*CLIENT_LOAD_OPTIONS)
+    else:
+        query = select(Cliente).options(*load_options(CLIENT_RELATIONS, expand))
     
     if name:
         query = query.filter((Cliente.nome.ilike(f"%{name}%")) | (Cliente.sobrenome.ilike(f"%{name}%")))
@@ -28,14 +44,28 @@ async def get_clients(
         query = query.filter(Cliente.ativo == active)
         
     if city:
-        query = query.join(Endereco).filter(
-            Endereco.cidade.ilike(f"%{city}%"),
-            Endereco.principal == True
+        # EXISTS em vez de JOIN para não repetir o cliente por endereço
+        query = query.filter(
+            Cliente.enderecos.any(
+                (Endereco.cidade.ilike(f"%{city}%")) & (Endereco.principal == True)
+            )
         )
     
-    return query.offset(skip).limit(limit).all()
+    query = query.order_by(Cliente.id)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.filter(Cliente.id > last_id)
+    else:
+        query = query.offset(skip)
+    
+    result = await db.execute(query.limit(limit))
+    return result.scalars().all()
 
-async def create_client(db: Session, client: ClientCreate):
+def client_cursor(client: Cliente) -> str:
+    """Cursor da próxima página a partir do último cliente retornado"""
+    return encode_cursor(client.id)
+
+async def create_client(db: AsyncSession, client: ClientCreate):
     """Cria um novo cliente com validações"""
     # Valida CPF
     if not validate_cpf(client.cpf):
@@ -45,8 +75,8 @@ async def create_client(db: Session, client: ClientCreate):
         )
     
     # Verifica se email já existe
-    existing_email = db.query(Cliente).filter(
-        Cliente.email == client.email).first()
+    existing_email = await db.scalar(
+        select(Cliente.id).filter(Cliente.email == client.email))
     if existing_email:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -56,9 +86,9 @@ async def create_client(db: Session, client: ClientCreate):
     # Verifica se CPF já existe
     client.cpf = remove_special_characters(client.cpf)
     
-    existing_cpf = db.query(Cliente).filter(
-        Cliente.cpf == client.cpf
-    ).first()
+    existing_cpf = await db.scalar(
+        select(Cliente.id).filter(Cliente.cpf == client.cpf)
+    )
     if existing_cpf:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -78,8 +108,8 @@ async def create_client(db: Session, client: ClientCreate):
     )
     
     db.add(db_client)
-    db.commit()
-    db.refresh(db_client)
+    await db.commit()
+    await db.refresh(db_client)
     
     
     if client.addresses and len(client.addresses) > 0:
@@ -99,9 +129,8 @@ async def create_client(db: Session, client: ClientCreate):
             
             # Cria cada endereço usando a função existente
             await create_address(db, db_client.id, data)
-        
-        db.refresh(db_client)
     
+    await db.refresh(db_client, attribute_names=["enderecos"])
     return db_client
     
     
@@ -111,14 +140,17 @@ async def create_client(db: Session, client: ClientCreate):
     # Adiciona endereços se fornecidos
     if client.addresses:
         await get_addresses(db, db_client.id, client.addresses)
-        db.refresh(db_client)
+        await db.refresh(db_client)
     
     return db_client
 
 
-async def get_client(db: Session, id: int):
+async def get_client(db: AsyncSession, id: int):
     """Obtém um cliente por ID"""
-    client = db.query(Cliente).filter(Cliente.id == id).first()
+    result = await db.execute(
+        select(Cliente).options(*CLIENT_LOAD_OPTIONS).filter(Cliente.id == id)
+    )
+    client = result.scalars().first()
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -126,9 +158,9 @@ async def get_client(db: Session, id: int):
         )
     return client
 
-async def update_client(db: Session, id: int, client: ClientUpdate):
+async def update_client(db: AsyncSession, id: int, client: ClientUpdate):
     """Atualiza um cliente existente"""
-    db_client = db.query(Cliente).filter(Cliente.id == id).first()
+    db_client = await db.get(Cliente, id)
     if not db_client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -143,9 +175,9 @@ async def update_client(db: Session, id: int, client: ClientUpdate):
     if client.email is not None:
         # Verifica se novo email já existe
         if client.email != db_client.email:
-            existing = db.query(Cliente).filter(
-                Cliente.email == client.email
-            ).first()
+            existing = await db.scalar(
+                select(Cliente.id).filter(Cliente.email == client.email)
+            )
             if existing:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
@@ -156,14 +188,14 @@ async def update_client(db: Session, id: int, client: ClientUpdate):
         db_client.telefone = client.phone
     
     db_client.atualizado_em = datetime.now(timezone.utc)
-    db.commit()
-    db.refresh(db_client)
+    await db.commit()
+    await db.refresh(db_client, attribute_names=["enderecos"])
     return db_client
 
 
-async def delete_client(db: Session, id: int):
+async def delete_client(db: AsyncSession, id: int):
     """Remove um cliente (soft delete)"""
-    db_client = db.query(Cliente).filter(Cliente.id == id).first()
+    db_client = await db.get(Cliente, id)
     if not db_client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -171,22 +203,22 @@ async def delete_client(db: Session, id: int):
         )
     
     # Verifica se cliente tem pedidos
-    has_orders = db.query(Pedido).filter(
-        Pedido.cliente_id == id
-    ).first() is not None
+    has_orders = await db.scalar(
+        select(Pedido.id).filter(Pedido.cliente_id == id).limit(1)
+    ) is not None
     
     if has_orders:
         # Soft delete (marca como inativo)
         db_client.ativo = False
         db_client.atualizado_em = datetime.now(timezone.utc)
-        db.commit()
+        await db.commit()
         return {"message": "Client deactivated (has existing orders)"}
     else:
         # Delete físico (se não tiver pedidos)
         
         # Remove endereços primeiro
-        db.query(Endereco).filter(Endereco.cliente_id == id).delete()
+        await db.execute(delete(Endereco).filter(Endereco.cliente_id == id))
         # Delete físico do cliente
-        db.delete(db_client)
-        db.commit()
+        await db.delete(db_client)
+        await db.commit()
         return {"message": "Client permanently deleted"}
\ No newline at end of file
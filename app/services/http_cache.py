@@ -0,0 +1,42 @@
+from fastapi import Response, status
+from hashlib import blake2b
+import os
+
+# Cache-Control padrão das rotas com ETag. As rotas exigem autenticação, então
+# o padrão é "private, no-cache": o navegador guarda a resposta e revalida com
+# If-None-Match. Cada router pode ser configurado por CACHE_CONTROL_<ROUTER>.
+DEFAULT_CACHE_CONTROL = os.getenv("CACHE_CONTROL_DEFAULT", "private, no-cache")
+
+
+def cache_control(router: str) -> str:
+    """Cache-Control configurado para um router (ex.: CACHE_CONTROL_PRODUCTS)"""
+    return os.getenv(f"CACHE_CONTROL_{router.upper()}", DEFAULT_CACHE_CONTROL)
+
+
+def weak_etag(*parts) -> str:
+    """ETag fraco a partir das partes que identificam a versão do recurso"""
+    digest = blake2b("|".join(str(part) for part in parts).encode(), digest_size=12)
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Comparação fraca do If-None-Match (aceita lista e "*")"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def cache_headers(etag: str, cache: str) -> dict:
+    return {"ETag": etag, "Cache-Control": cache}
+
+
+def not_modified(etag: str, cache: str) -> Response:
+    """Resposta 304 sem corpo (nada é consultado ou serializado além da versão)"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(etag, cache))
@@ -0,0 +1,126 @@
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from connectDB.database import engine
+from services.cache import cache_registry
+from uuid import uuid4
+import asyncio
+import asyncpg
+import logging
+import json
+import os
+
+# Propagação de invalidações de cache entre workers via LISTEN/NOTIFY
+CACHE_INVALIDATION = os.getenv("CACHE_INVALIDATION", "true").lower() == "true"
+# LISTEN não funciona através do PgBouncer em modo transaction: nesse caso,
+# aponte CACHE_LISTEN_URL direto para o Postgres
+CACHE_LISTEN_URL = os.getenv("CACHE_LISTEN_URL")
+CACHE_LISTEN_RECONNECT = float(os.getenv("CACHE_LISTEN_RECONNECT", "5"))
+
+CHANNEL = "cache_invalidation"
+# Limite do payload do NOTIFY é 8000 bytes; acima disso o cache inteiro é limpo
+MAX_PAYLOAD = 7900
+# Intervalo da verificação da conexão de escuta
+HEALTH_CHECK_INTERVAL = 30
+
+logger = logging.getLogger(__name__)
+
+
+class PostgresInvalidation:
+    """Backend de invalidação do CacheRegistry sobre LISTEN/NOTIFY.
+
+    Cada escrita envia o NOTIFY na própria transação: o Postgres só o entrega
+    se o commit acontecer, então uma invalidação nunca se perde entre o commit
+    e a publicação. Cada worker mantém uma conexão dedicada escutando o canal e
+    remove as chaves do seu cache local.
+    """
+
+    def __init__(self, engine: AsyncEngine, listen_url: str | None = None):
+        self.engine = engine
+        self.listen_url = listen_url or engine.url.set(drivername="postgresql").render_as_string(
+            hide_password=False
+        )
+        # Identifica o worker para ignorar as próprias notificações
+        self.origin = uuid4().hex
+        self.published = 0
+        self.received = 0
+        self.reconnects = 0
+        self.connected = False
+        self._task: asyncio.Task | None = None
+
+    async def publish(self, db: AsyncSession, name: str, keys: tuple):
+        payload = json.dumps({"origin": self.origin, "cache": name, "keys": list(keys)}, default=str)
+        if len(payload) > MAX_PAYLOAD:
+            payload = json.dumps({"origin": self.origin, "cache": name, "keys": []})
+
+        # Sem tratamento de erro: se o NOTIFY falhar, a transação (e a escrita) falha junto
+        await db.execute(
+            text("SELECT pg_notify(:channel, :payload)"),
+            {"channel": CHANNEL, "payload": payload},
+        )
+        self.published += 1
+
+    def on_notification(self, connection, pid, channel, payload):
+        self.received += 1
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        if message.get("origin") == self.origin:
+            return
+        cache_registry.evict(message.get("cache"), tuple(message.get("keys") or ()))
+
+    async def listen(self):
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.listen_url)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(CHANNEL, self.on_notification)
+                self.connected = True
+
+                # Notificações enviadas enquanto estava desconectado foram perdidas
+                for name in cache_registry.caches:
+                    cache_registry.evict(name)
+
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=HEALTH_CHECK_INTERVAL)
+                    except asyncio.TimeoutError:
+                        await connection.execute("SELECT 1")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Cache invalidation listener disconnected")
+            finally:
+                self.connected = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+
+            self.reconnects += 1
+            await asyncio.sleep(CACHE_LISTEN_RECONNECT)
+
+    def start(self):
+        cache_registry.backend = self
+        self._task = asyncio.create_task(self.listen())
+
+    async def stop(self):
+        cache_registry.backend = None
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "channel": CHANNEL,
+            "connected": self.connected,
+            "published": self.published,
+            "received": self.received,
+            "reconnects": self.reconnects,
+        }
+
+
+invalidation = PostgresInvalidation(engine, CACHE_LISTEN_URL)
@@ -0,0 +1,105 @@
+from sqlalchemy import select
+from connectDB.database import SessionLocal, Pedido, ItemPedido
+from services.orders import apply_order_filters
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import AsyncIterator
+import csv
+import io
+import json
+import os
+
+# Linhas buscadas por vez do cursor no servidor
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "1000"))
+# Tamanho aproximado (em caracteres) de cada bloco enviado ao cliente
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "65536"))
+
+ORDER_COLUMNS = [
+    Pedido.id, Pedido.cliente_id, Pedido.usuario_id, Pedido.status,
+    Pedido.valor_total, Pedido.valor_desconto, Pedido.valor_frete,
+    Pedido.metodo_pagamento, Pedido.endereco_entrega, Pedido.observacoes,
+    Pedido.data_entrega_prevista, Pedido.criado_em, Pedido.atualizado_em,
+]
+ITEM_COLUMNS = [
+    ItemPedido.id.label("item_id"), ItemPedido.produto_id, ItemPedido.quantidade,
+    ItemPedido.preco_unitario, ItemPedido.desconto, ItemPedido.total_item,
+]
+ORDER_FIELDS = [column.key for column in ORDER_COLUMNS]
+ITEM_FIELDS = ["item_id", "produto_id", "quantidade", "preco_unitario", "desconto", "total_item"]
+
+
+def plain(value):
+    """Converte valores do banco para tipos serializáveis em JSON/CSV"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def stream_order_rows(filters: dict) -> AsyncIterator:
+    """Percorre pedidos + itens com cursor no servidor, sem carregar o resultado em memória"""
+    query = apply_order_filters(
+        select(*ORDER_COLUMNS, *ITEM_COLUMNS).outerjoin(ItemPedido, ItemPedido.pedido_id == Pedido.id),
+        **filters
+    ).order_by(Pedido.criado_em.desc(), Pedido.id.desc(), ItemPedido.id)
+
+    # Sessão própria: a sessão da requisição é fechada antes do streaming começar
+    async with SessionLocal() as db:
+        result = await db.stream(query.execution_options(yield_per=EXPORT_FETCH_SIZE))
+        async for row in result:
+            yield row
+
+
+async def export_orders_ndjson(filters: dict) -> AsyncIterator[str]:
+    """Um pedido por linha, com os itens em uma lista"""
+    buffer = []
+    size = 0
+    current = None
+
+    def flush_order():
+        nonlocal size
+        line = json.dumps(current, ensure_ascii=False) + "\n"
+        buffer.append(line)
+        size += len(line)
+
+    async for row in stream_order_rows(filters):
+        mapping = row._mapping
+        if current is None or current["id"] != row.id:
+            if current is not None:
+                flush_order()
+            current = {field: plain(mapping[field]) for field in ORDER_FIELDS}
+            current["itens"] = []
+        if row.item_id is not None:
+            current["itens"].append({field: plain(mapping[field]) for field in ITEM_FIELDS})
+
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer.clear()
+            size = 0
+
+    if current is not None:
+        flush_order()
+    if buffer:
+        yield "".join(buffer)
+
+
+async def export_orders_csv(filters: dict) -> AsyncIterator[str]:
+    """Uma linha por item, repetindo os dados do pedido"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ORDER_FIELDS + ITEM_FIELDS)
+
+    async for row in stream_order_rows(filters):
+        mapping = row._mapping
+        writer.writerow([plain(mapping[field]) for field in ORDER_FIELDS + ITEM_FIELDS])
+
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
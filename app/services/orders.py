@@ -1,15 +1,43 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select, insert, update, values, column, tuple_, func, Integer
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from connectDB.database import Pedido, ItemPedido, Produto, Cliente, Usuario
-from schemas.orders import OrderCreate, OrderUpdate, OrderStatus, PaymentMethod
+from schemas.orders import OrderCreate, OrderCreateAdapter, OrderUpdate, OrderStatus, PaymentMethod, OrderItem
+from schemas.products import Product, Image
+from services.utilities import encode_cursor, decode_cursor, format_validation_error
+from services.serialization import load_options
+from services.cache import cache_registry
+from metrics import orders_created
 from datetime import datetime, timezone
 from decimal import Decimal
 from fastapi import HTTPException, status
-from typing import List
+from pydantic import ValidationError
+from typing import Any, List
+import os
 
-async def get_orders(
-    db: Session,
-    skip: int = 0,
-    limit: int = 100,
+# Quantidade máxima de pedidos aceita por POST /orders/batch
+ORDER_BATCH_MAX_SIZE = int(os.getenv("ORDER_BATCH_MAX_SIZE", "1000"))
+
+# Grafo completo serializado por schemas.orders.Order: pedido -> itens -> produto -> imagens.
+# Cada nível é carregado com um único SELECT ... IN, então uma página custa sempre
+# 4 consultas, independente da quantidade de pedidos ou itens.
+ORDER_LOAD_OPTIONS = (
+    selectinload(Pedido.itens)
+    .selectinload(ItemPedido.produto)
+    .selectinload(Produto.imagens),
+)
+
+# Relacionamentos que GET /orders/ pode expandir (?expand=items.product.images)
+ORDER_RELATIONS = {
+    "items": (Pedido.itens, OrderItem, {
+        "product": (ItemPedido.produto, Product, {
+            "images": (Produto.imagens, Image, {}),
+        }),
+    }),
+}
+
+def apply_order_filters(
+    query,
     start_date: datetime | None = None,
     end_date: datetime | None = None,
     category: int | None = None,
@@ -18,10 +46,7 @@ async def get_orders(
     client_id: int | None = None,
     user_id: int | None = None
 ):
-    """Lista pedidos com filtros avançados"""
-    query = db.query(Pedido)
-    
-    # Aplicar filtros
+    """Aplica os filtros de listagem de pedidos a uma consulta sobre Pedido"""
     if order_id:
         query = query.filter(Pedido.id == order_id)
     if client_id:
@@ -35,14 +60,189 @@ async def get_orders(
     if end_date:
         query = query.filter(Pedido.criado_em <= end_date)
     if category:
-        query = query.join(ItemPedido).join(Produto).filter(
-            Produto.categoria_id == category
+        # EXISTS em vez de JOIN: o join repetia o pedido para cada item da categoria
+        # e a paginação passava a contar itens em vez de pedidos
+        query = query.filter(
+            Pedido.itens.any(ItemPedido.produto.has(Produto.categoria_id == category))
         )
+    return query
+
+async def get_orders(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    start_date: datetime | None = None,
+    end_date: datetime | None = None,
+    category: int | None = None,
+    order_id: int | None = None,
+    status: str | None = None,
+    client_id: int | None = None,
+    user_id: int | None = None,
+    cursor: str | None = None,
+    expand: set[str] | None = None
+):
+    """Lista pedidos com filtros avançados (paginação por cursor ou offset).
+
+    `expand` limita os relacionamentos carregados (caminhos de ORDER_RELATIONS);
+    sem ele o grafo completo é carregado.
+    """
+    if expand is None:
+        query = select(Pedido).options(*ORDER_LOAD_OPTIONS)
+    else:
+        query = select(Pedido).options(*load_options(ORDER_RELATIONS, expand))
+    
+    # Aplicar filtros
+    query = apply_order_filters(
+        query, start_date, end_date, category, order_id, status, client_id, user_id
+    )
+    
+    query = query.order_by(Pedido.criado_em.desc(), Pedido.id.desc())
+    if cursor:
+        # Keyset: continua a partir do último (criado_em, id) da página anterior
+        created_at, last_id = decode_cursor(cursor, datetime.fromisoformat, int)
+        query = query.filter(tuple_(Pedido.criado_em, Pedido.id) < (created_at, last_id))
+    else:
+        # Offset mantido por compatibilidade
+        query = query.offset(skip)
+
+    result = await db.execute(query.limit(limit))
+    return result.scalars().all()
+
+def order_cursor(order: Pedido) -> str:
+    """Cursor da próxima página a partir do último pedido retornado"""
+    return encode_cursor(order.criado_em.isoformat(), order.id)
+
+async def lock_products(db: AsyncSession, product_ids) -> dict[int, Produto]:
+    """Carrega os produtos em um único SELECT ... FOR UPDATE.
+
+    As linhas são travadas em ordem de id para que pedidos concorrentes com os
+    mesmos produtos não entrem em deadlock.
+    """
+    result = await db.execute(
+        select(Produto)
+        .filter(Produto.id.in_(sorted(set(product_ids))))
+        .order_by(Produto.id)
+        .with_for_update()
+    )
+    return {product.id: product for product in result.scalars()}
+
+async def reserve_stock(db: AsyncSession, quantities: dict[int, int]):
+    """Baixa o estoque de vários produtos com um único UPDATE condicional.
+
+    Só atualiza as linhas com estoque suficiente; se alguma ficar de fora a
+    reserva inteira falha.
+    """
+    stock = values(
+        column("id", Integer), column("quantidade", Integer), name="reserva"
+    ).data(sorted(quantities.items()))
+
+    produtos = Produto.__table__
+    result = await db.execute(
+        update(produtos)
+        .where(produtos.c.id == stock.c.id, produtos.c.estoque >= stock.c.quantidade)
+        .values(
+            estoque=produtos.c.estoque - stock.c.quantidade,
+            atualizado_em=datetime.now(timezone.utc)
+        )
+        .returning(produtos.c.id)
+    )
+    updated = {row.id for row in result}
+    return set(quantities) - updated
+
+async def restore_stock(db: AsyncSession, quantities: dict[int, int]) -> dict[int, int]:
+    """Devolve o estoque de vários produtos com um único UPDATE ... FROM (VALUES ...).
+
+    As linhas são travadas antes em ordem de id, a mesma ordem usada na criação
+    de pedidos, evitando deadlock. Retorna o estoque resultante de cada produto.
+    """
+    if not quantities:
+        return {}
+
+    await db.execute(
+        select(Produto.id)
+        .filter(Produto.id.in_(sorted(quantities)))
+        .order_by(Produto.id)
+        .with_for_update()
+    )
+
+    stock = values(
+        column("id", Integer), column("quantidade", Integer), name="devolucao"
+    ).data(sorted(quantities.items()))
+
+    produtos = Produto.__table__
+    result = await db.execute(
+        update(produtos)
+        .where(produtos.c.id == stock.c.id)
+        .values(
+            estoque=produtos.c.estoque + stock.c.quantidade,
+            atualizado_em=datetime.now(timezone.utc)
+        )
+        .returning(produtos.c.id, produtos.c.estoque)
+    )
+    return {row.id: row.estoque for row in result}
+
+def order_quantities(order: OrderCreate) -> dict[int, int]:
+    """Quantidade total por produto (o mesmo produto pode aparecer em mais de um item)"""
+    quantities: dict[int, int] = {}
+    for item in order.items:
+        quantities[item.product_id] = quantities.get(item.product_id, 0) + item.quantity
+    return quantities
+
+def check_order_stock(
+    quantities: dict[int, int],
+    products: dict[int, Produto],
+    available: dict[int, int]
+) -> str | None:
+    """Valida existência, status e estoque dos produtos; retorna a mensagem de erro, se houver"""
+    for product_id, quantity in quantities.items():
+        product = products.get(product_id)
+        if not product:
+            return f"Product {product_id} not found"
+        
+        if not product.ativo:
+            return f"Product {product.nome} is inactive"
+        
+        if available[product_id] < quantity:
+            return f"Insufficient stock for product {product.nome}. Available: {available[product_id]}"
+    return None
+
+def build_order_rows(order: OrderCreate, user_id: int) -> tuple[dict, list[dict]]:
+    """Monta as linhas de pedidos e itens_pedido, calculando os totais"""
+    order_items = []
+    total = Decimal('0.00')
+    shipping_cost = Decimal('0.00')  # Poderia ser calculado com base em regras de negócio
+    
+    for item in order.items:
+        # Calcula total do item
+        item_total = Decimal(str(item.unit_price)) * item.quantity - Decimal(str(item.discount))
+        total += item_total
+        
+        order_items.append({
+            "produto_id": item.product_id,
+            "quantidade": item.quantity,
+            "preco_unitario": item.unit_price,
+            "desconto": item.discount,
+            "total_item": float(item_total)
+        })
     
-    return query.order_by(Pedido.criado_em.desc()).offset(skip).limit(limit).all()
+    order_row = {
+        "cliente_id": order.client_id,
+        "usuario_id": user_id,
+        "status": OrderStatus.PENDING.value,
+        "valor_total": float(total),
+        "valor_desconto": 0.00,  # Poderia ser calculado com cupons, etc.
+        "valor_frete": float(shipping_cost),
+        "metodo_pagamento": order.payment_method.value,
+        "observacoes": order.notes,
+        "endereco_entrega": order.shipping_address,
+        "data_entrega_prevista": order.expected_delivery_date,
+        "criado_em": datetime.now(timezone.utc),
+        "atualizado_em": datetime.now(timezone.utc)
+    }
+    return order_row, order_items
 
-async def create_order(db: Session, order: OrderCreate, user_id: int):
-    """Cria um novo pedido com validação de estoque"""
+async def create_order(db: AsyncSession, order: OrderCreate, user_id: int):
+    """Cria um novo pedido com validação e reserva de estoque em uma única transação"""
     # Validações iniciais
     if not order.items or len(order.items) == 0:
         raise HTTPException(
@@ -51,95 +251,150 @@ async def create_order(db: Session, order: OrderCreate, user_id: int):
         )
     
     # Verifica se cliente existe
-    client = db.query(Cliente).filter(Cliente.id == order.client_id).first()
+    client = await db.get(Cliente, order.client_id)
     if not client:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Client not found"
         )
     
-    # Prepara itens e calcula totais
-    order_items = []
-    total = Decimal('0.00')
-    shipping_cost = Decimal('0.00')  # Poderia ser calculado com base em regras de negócio
-    
-    # Valida cada item do pedido
-    for item in order.items:
-        product = db.query(Produto).filter(Produto.id == item.product_id).first()
-        if not product:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Product {item.product_id} not found"
-            )
-        
-        if not product.ativo:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Product {product.nome} is inactive"
-            )
-        
-        if product.estoque < item.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient stock for product {product.nome}. Available: {product.estoque}"
-            )
-        
-        # Calcula total do item
-        item_total = Decimal(str(item.unit_price)) * item.quantity - Decimal(str(item.discount))
-        total += item_total
-        
-        order_items.append({
-            "product": product,
-            "quantity": item.quantity,
-            "unit_price": item.unit_price,
-            "discount": item.discount,
-            "total": float(item_total)
-        })
+    quantities = order_quantities(order)
+    products = await lock_products(db, quantities)
     
-    # Cria o pedido no banco de dados
-    db_order = Pedido(
-        cliente_id=order.client_id,
-        usuario_id=user_id,
-        status=OrderStatus.PENDING.value,
-        valor_total=float(total),
-        valor_desconto=0.00,  # Poderia ser calculado com cupons, etc.
-        valor_frete=float(shipping_cost),
-        metodo_pagamento=order.payment_method.value,
-        observacoes=order.notes,
-        endereco_entrega=order.shipping_address,
-        data_entrega_prevista=order.expected_delivery_date,
-        criado_em=datetime.now(timezone.utc),
-        atualizado_em=datetime.now(timezone.utc)
+    # Valida os produtos do pedido
+    error = check_order_stock(
+        quantities, products, {id: product.estoque for id, product in products.items()}
     )
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+    
+    # Baixa o estoque de todos os produtos de uma vez
+    missing = await reserve_stock(db, quantities)
+    if missing:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Insufficient stock for products {sorted(missing)}"
+        )
     
+    # Cria o pedido no banco de dados
+    order_row, order_items = build_order_rows(order, user_id)
+    db_order = Pedido(**order_row)
     db.add(db_order)
-    db.commit()
-    db.refresh(db_order)
+    await db.flush()
     
-    # Adiciona itens do pedido e atualiza estoque
+    # Insere todos os itens em um único INSERT
     for item in order_items:
-        # Cria item do pedido
-        db_item = ItemPedido(
-            pedido_id=db_order.id,
-            produto_id=item["product"].id,
-            quantidade=item["quantity"],
-            preco_unitario=item["unit_price"],
-            desconto=item["discount"],
-            total_item=item["total"]
+        item["pedido_id"] = db_order.id
+    await db.execute(insert(ItemPedido), order_items)
+    
+    # Pedido, itens e estoque confirmados juntos
+    await cache_registry.invalidate(db, "products", *quantities)
+    await db.commit()
+    orders_created.inc()
+    return await get_order(db, db_order.id)
+
+async def create_orders_batch(db: AsyncSession, orders: List[Any], user_id: int):
+    """Cria vários pedidos em uma única transação.
+
+    Cada pedido é validado com OrderCreateAdapter, clientes e produtos são
+    validados com uma consulta cada, o estoque é reservado em uma passada e
+    pedidos/itens são inseridos em lote. Um pedido inválido é reportado no
+    resultado sem interromper os demais.
+    """
+    if not orders or len(orders) > ORDER_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch must have between 1 and {ORDER_BATCH_MAX_SIZE} orders"
         )
-        db.add(db_item)
+    
+    results = [
+        {"index": index, "success": False, "order_id": None, "error": None}
+        for index in range(len(orders))
+    ]
+    
+    valid_orders = []
+    for index, raw_order in enumerate(orders):
+        try:
+            valid_orders.append((index, OrderCreateAdapter.validate_python(raw_order)))
+        except ValidationError as exc:
+            results[index]["error"] = format_validation_error(exc)
+    
+    client_ids = {order.client_id for _, order in valid_orders}
+    result = await db.execute(select(Cliente.id).filter(Cliente.id.in_(client_ids)))
+    existing_clients = set(result.scalars())
+    
+    product_ids = {item.product_id for _, order in valid_orders for item in order.items}
+    products = await lock_products(db, product_ids) if product_ids else {}
+    available = {id: product.estoque for id, product in products.items()}
+    
+    # Reserva o estoque em memória, na ordem do lote
+    reserved: dict[int, int] = {}
+    accepted = []
+    for index, order in valid_orders:
+        if not order.items:
+            results[index]["error"] = "Order must have at least one item"
+            continue
+        if order.client_id not in existing_clients:
+            results[index]["error"] = "Client not found"
+            continue
+        
+        quantities = order_quantities(order)
+        error = check_order_stock(quantities, products, available)
+        if error:
+            results[index]["error"] = error
+            continue
         
-        # Atualiza estoque do produto
-        item["product"].estoque -= item["quantity"]
-        item["product"].atualizado_em = datetime.now(timezone.utc)
+        for product_id, quantity in quantities.items():
+            available[product_id] -= quantity
+            reserved[product_id] = reserved.get(product_id, 0) + quantity
+        accepted.append((index, order))
     
-    db.commit()
-    db.refresh(db_order)
-    return db_order
+    if not accepted:
+        await db.rollback()
+        return results
+    
+    # Os produtos estão travados, então a baixa consolidada não pode falhar por concorrência
+    missing = await reserve_stock(db, reserved)
+    if missing:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Insufficient stock for products {sorted(missing)}"
+        )
+    
+    rows = [build_order_rows(order, user_id) for _, order in accepted]
+    result = await db.execute(
+        insert(Pedido).returning(Pedido.id, sort_by_parameter_order=True),
+        [order_row for order_row, _ in rows]
+    )
+    order_ids = result.scalars().all()
+    
+    all_items = []
+    for (index, _), (_, order_items), order_id in zip(accepted, rows, order_ids):
+        for item in order_items:
+            item["pedido_id"] = order_id
+        all_items.extend(order_items)
+        results[index].update(success=True, order_id=order_id)
+    
+    await db.execute(insert(ItemPedido), all_items)
+    await cache_registry.invalidate(db, "products", *reserved)
+    await db.commit()
+    orders_created.inc(len(accepted))
+    return results
 
-async def get_order(db: Session, id: int):
+async def get_order(db: AsyncSession, id: int):
     """Obtém um pedido específico por ID"""
-    order = db.query(Pedido).filter(Pedido.id == id).first()
+    result = await db.execute(
+        select(Pedido)
+        .options(*ORDER_LOAD_OPTIONS)
+        .filter(Pedido.id == id)
+        .execution_options(populate_existing=True)
+    )
+    order = result.scalars().first()
     if not order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -147,9 +402,9 @@ async def get_order(db: Session, id: int):
         )
     return order
 
-async def update_order(db: Session, id: int, order: OrderUpdate):
+async def update_order(db: AsyncSession, id: int, order: OrderUpdate):
     """Atualiza um pedido existente"""
-    db_order = db.query(Pedido).filter(Pedido.id == id).first()
+    db_order = await db.get(Pedido, id)
     if not db_order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -185,13 +440,16 @@ async def update_order(db: Session, id: int, order: OrderUpdate):
         db_order.endereco_entrega = order.shipping_address
     
     db_order.atualizado_em = datetime.now(timezone.utc)
-    db.commit()
-    db.refresh(db_order)
-    return db_order
+    await db.commit()
+    return await get_order(db, id)
 
-async def delete_order(db: Session, id: int):
-    """Cancela/remove um pedido"""
-    db_order = db.query(Pedido).filter(Pedido.id == id).first()
+async def delete_order(db: AsyncSession, id: int):
+    """Cancela/remove um pedido, devolvendo o estoque dos itens"""
+    # Trava o pedido para que dois cancelamentos simultâneos não devolvam o estoque duas vezes
+    result = await db.execute(
+        select(Pedido).filter(Pedido.id == id).with_for_update()
+    )
+    db_order = result.scalars().first()
     if not db_order:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -205,16 +463,33 @@ async def delete_order(db: Session, id: int):
             detail="Cannot cancel an order that has already been shipped or delivered"
         )
     
+    if db_order.status == OrderStatus.CANCELLED.value:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Order is already cancelled"
+        )
+    
+    # Quantidade a devolver por produto
+    result = await db.execute(
+        select(ItemPedido.produto_id, func.sum(ItemPedido.quantidade))
+        .filter(ItemPedido.pedido_id == id)
+        .group_by(ItemPedido.produto_id)
+    )
+    quantities = {product_id: int(quantity) for product_id, quantity in result}
+    
     # Restaura estoque dos produtos
-    for item in db_order.itens:
-        product = db.query(Produto).filter(Produto.id == item.produto_id).first()
-        if product:
-            product.estoque += item.quantidade
-            product.atualizado_em = datetime.now(timezone.utc)
+    stock_levels = await restore_stock(db, quantities)
     
     # Atualiza status para cancelado
     db_order.status = OrderStatus.CANCELLED.value
     db_order.atualizado_em = datetime.now(timezone.utc)
-    db.commit()
+    await cache_registry.invalidate(db, "products", *quantities)
+    await db.commit()
     
-    return {"message": "Order cancelled successfully"}
\ No newline at end of file
+    return {
+        "message": "Order cancelled successfully",
+        "products": [
+            {"product_id": product_id, "stock": stock}
+            for product_id, stock in sorted(stock_levels.items())
+        ]
+    }
\ No newline at end of file
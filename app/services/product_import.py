@@ -0,0 +1,127 @@
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from connectDB.database import CategoriaProduto
+from schemas.products import ProductInput
+from datetime import timezone
+from decimal import Decimal
+from itertools import islice
+from services.cache import cache_registry
+from services.utilities import (
+    iter_upload_rows,
+    format_validation_error,
+    IMPORT_CHUNK_SIZE,
+    IMPORT_MAX_ERRORS,
+)
+from typing import BinaryIO
+
+STAGING_COLUMNS = [
+    "nome", "descricao", "valor_venda", "codigo_barras", "categoria_id",
+    "estoque", "estoque_minimo", "data_validade", "ativo",
+]
+
+
+def to_record(product: ProductInput) -> tuple:
+    """Converte o produto validado para a tupla enviada ao COPY"""
+    expiry_date = product.expiry_date
+    if expiry_date is not None and expiry_date.tzinfo is not None:
+        expiry_date = expiry_date.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return (
+        product.name,
+        product.description,
+        Decimal(str(product.sale_price)),
+        product.barcode,
+        product.category_id,
+        product.stock,
+        product.min_stock,
+        expiry_date,
+        product.status,
+    )
+
+
+async def import_products(db: AsyncSession, file: BinaryIO, file_format: str = "csv") -> dict:
+    """Importa produtos em massa via COPY para uma tabela temporária + upsert por código de barras"""
+    report = {"received": 0, "inserted": 0, "updated": 0, "rejected": 0, "errors": []}
+
+    def reject(line_number: int, error: str):
+        report["rejected"] += 1
+        if len(report["errors"]) < IMPORT_MAX_ERRORS:
+            report["errors"].append({"line": line_number, "error": error})
+
+    # Categorias carregadas uma vez para validar todas as linhas em memória
+    result = await db.execute(select(CategoriaProduto.id))
+    categories = set(result.scalars())
+    seen_barcodes: set[str] = set()
+
+    # Tabela temporária na mesma transação; descartada no commit
+    await db.execute(text(
+        "CREATE TEMP TABLE produtos_import ("
+        "nome VARCHAR(100), descricao VARCHAR(200), valor_venda NUMERIC(10, 2), "
+        "codigo_barras VARCHAR(50), categoria_id INTEGER, estoque INTEGER, "
+        "estoque_minimo INTEGER, data_validade TIMESTAMP, ativo BOOLEAN"
+        ") ON COMMIT DROP"
+    ))
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver = raw_connection.driver_connection
+
+    rows = iter_upload_rows(file, file_format)
+    while True:
+        # Leitura do arquivo fora do event loop, um bloco por vez
+        chunk = await run_in_threadpool(lambda: list(islice(rows, IMPORT_CHUNK_SIZE)))
+        if not chunk:
+            break
+
+        records = []
+        for line_number, row, error in chunk:
+            report["received"] += 1
+            if error:
+                reject(line_number, error)
+                continue
+
+            # O schema aplica os limites das colunas (tamanhos, CHECKs, NUMERIC(10, 2)):
+            # uma linha inválida é rejeitada aqui em vez de abortar o COPY e o upsert
+            try:
+                product = ProductInput.model_validate(row)
+            except ValidationError as exc:
+                reject(line_number, format_validation_error(exc))
+                continue
+
+            if not product.barcode:
+                reject(line_number, "codigo_barras is required for import")
+                continue
+            if product.barcode in seen_barcodes:
+                reject(line_number, f"Duplicate barcode {product.barcode} in file")
+                continue
+            if product.category_id not in categories:
+                reject(line_number, f"Category {product.category_id} not found")
+                continue
+
+            seen_barcodes.add(product.barcode)
+            records.append(to_record(product))
+
+        if records:
+            await driver.copy_records_to_table(
+                "produtos_import", records=records, columns=STAGING_COLUMNS
+            )
+
+    # Um único upsert da tabela temporária para produtos
+    columns = ", ".join(STAGING_COLUMNS)
+    updates = ", ".join(
+        f"{column} = EXCLUDED.{column}" for column in STAGING_COLUMNS if column != "codigo_barras"
+    )
+    result = await db.execute(text(
+        f"INSERT INTO produtos ({columns}, criado_em, atualizado_em) "
+        f"SELECT {columns}, timezone('utc', now()), timezone('utc', now()) FROM produtos_import "
+        f"ON CONFLICT (codigo_barras) DO UPDATE SET {updates}, atualizado_em = EXCLUDED.atualizado_em "
+        "RETURNING (xmax = 0) AS inserted"
+    ))
+    for (inserted,) in result:
+        report["inserted" if inserted else "updated"] += 1
+
+    # O upsert pode ter alterado qualquer produto: limpa o cache inteiro
+    await cache_registry.invalidate(db, "products")
+    await db.commit()
+    return report
@@ -1,23 +1,44 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
 from connectDB.database import Produto, ImagemProduto, CategoriaProduto, ItemPedido
-from schemas.products import ProductCreate, ProductUpdate, Product
+from schemas.products import ProductCreate, ProductUpdate, Product, Image
+from services.utilities import encode_cursor, decode_cursor
+from services.serialization import load_options
+from services.http_cache import weak_etag
+from services.cache import TTLCache, cache_registry, CATALOG_CACHE_SIZE, CATALOG_CACHE_TTL
 from datetime import datetime, timezone
 from typing import List
 from fastapi import HTTPException, status
 
+# Relacionamentos que GET /products/ pode expandir (?expand=images)
+PRODUCT_RELATIONS = {
+    "images": (Produto.imagens, Image, {}),
+}
+
+# Produtos lidos por id (schema Product já validado), invalidados nas escritas
+product_cache = cache_registry.register(
+    "products", TTLCache(maxsize=CATALOG_CACHE_SIZE, ttl=CATALOG_CACHE_TTL)
+)
+
 # GET
 async def get_products(
-    db: Session,
+    db: AsyncSession,
     skip: int = 0,
     limit: int = 100,
     category: int | None = None,
     min_price: float | None = None,
     max_price: float | None = None,
     in_stock: bool | None = None,
-    active: bool | None = None
+    active: bool | None = None,
+    cursor: str | None = None,
+    expand: set[str] | None = None
 ):
-    """Lista produtos com filtros avançados"""
-    query = db.query(Produto)
+    """Lista produtos com filtros avançados (paginação por cursor ou offset)"""
+    if expand is None:
+        query = select(Produto).options(selectinload(Produto.imagens))
+    else:
+        query = select(Produto).options(*load_options(PRODUCT_RELATIONS, expand))
     
     # Aplicar filtros
     if category:
@@ -34,15 +55,25 @@ async def get_products(
     if active is not None:
         query = query.filter(Produto.ativo == active)
     
-    return query.offset(skip).limit(limit).all()
+    query = query.order_by(Produto.id)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, int)
+        query = query.filter(Produto.id > last_id)
+    else:
+        query = query.offset(skip)
+    
+    result = await db.execute(query.limit(limit))
+    return result.scalars().all()
+
+def product_cursor(product: Produto) -> str:
+    """Cursor da próxima página a partir do último produto retornado"""
+    return encode_cursor(product.id)
 
 # PUT
-async def create_product(db: Session, product: ProductCreate):
+async def create_product(db: AsyncSession, product: ProductCreate):
     """Cria um novo produto com validações"""
     # Verifica se categoria existe
-    category = db.query(CategoriaProduto).filter(
-        CategoriaProduto.id == product.category_id
-    ).first()
+    category = await db.get(CategoriaProduto, product.category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -51,9 +82,9 @@ async def create_product(db: Session, product: ProductCreate):
     
     # Verifica se código de barras é único (se fornecido)
     if product.barcode:
-        existing = db.query(Produto).filter(
-            Produto.codigo_barras == product.barcode
-        ).first()
+        existing = await db.scalar(
+            select(Produto.id).filter(Produto.codigo_barras == product.barcode)
+        )
         if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -77,8 +108,9 @@ async def create_product(db: Session, product: ProductCreate):
     )
     
     db.add(db_product)
-    db.commit()
-    db.refresh(db_product)
+    # flush para obter o id; produto e imagens são gravados no mesmo commit,
+    # assim nenhuma leitura (e nenhum ETag) vê o produto sem as imagens
+    await db.flush()
     
     # Adiciona imagens se existirem
     if product.images and len(product.images) > 0:
@@ -90,15 +122,22 @@ async def create_product(db: Session, product: ProductCreate):
                 criado_em=datetime.now(timezone.utc)
             )
             db.add(db_image)
-        db.commit()
+    await db.commit()
     
+    await db.refresh(db_product, attribute_names=["imagens"])
     return db_product
 
 # GET
-async def get_product(db: Session, id: int):
-    """Obtém um produto específico por ID"""
+async def get_product(db: AsyncSession, id: int):
+    """Obtém um produto específico por ID (usa o cache do catálogo)"""
+    cached = product_cache.get(id)
+    if cached is not None:
+        return cached
     
-    product = db.query(Produto).options(joinedload(Produto.imagens)).filter(Produto.id == id).first()
+    result = await db.execute(
+        select(Produto).options(joinedload(Produto.imagens)).filter(Produto.id == id)
+    )
+    product = result.unique().scalars().first()
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -106,13 +145,32 @@ async def get_product(db: Session, id: int):
         )
     
     # Convertendo para o schema Product que inclui imagens
-    return Product.model_validate(product)
+    product = Product.model_validate(product)
+    product_cache.set(id, product)
+    return product
+
+def product_etag(id: int, updated_at: datetime | None) -> str:
+    """ETag fraco do produto, derivado de atualizado_em"""
+    return weak_etag("produto", id, updated_at.isoformat() if updated_at else "")
+
+async def get_product_etag(db: AsyncSession, id: int) -> str | None:
+    """ETag atual do produto consultando apenas atualizado_em (None se não existir)"""
+    cached = product_cache.get(id)
+    if cached is not None:
+        return product_etag(cached.id, cached.updated_at)
+
+    row = (await db.execute(
+        select(Produto.atualizado_em).filter(Produto.id == id)
+    )).first()
+    if row is None:
+        return None
+    return product_etag(id, row.atualizado_em)
 
 
 # UPDATE
-async def update_product(db: Session, id: int, product: ProductUpdate):
+async def update_product(db: AsyncSession, id: int, product: ProductUpdate):
     """Atualiza um produto existente"""
-    db_product = db.query(Produto).filter(Produto.id == id).first()
+    db_product = await db.get(Produto, id)
     if not db_product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -136,14 +194,15 @@ async def update_product(db: Session, id: int, product: ProductUpdate):
         db_product.data_validade = product.expiry_date
     
     db_product.atualizado_em = datetime.now(timezone.utc)
-    db.commit()
-    db.refresh(db_product)
+    await cache_registry.invalidate(db, "products", id)
+    await db.commit()
+    await db.refresh(db_product, attribute_names=["imagens"])
     return db_product
 
 # DELETE
-async def delete_product(db: Session, id: int):
+async def delete_product(db: AsyncSession, id: int):
     """Remove um produto (soft delete ou físico)"""
-    db_product = db.query(Produto).filter(Produto.id == id).first()
+    db_product = await db.get(Produto, id)
     if not db_product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -151,26 +210,33 @@ async def delete_product(db: Session, id: int):
         )
     
     # Verifica se o produto está em algum pedido
-    has_orders = db.query(ItemPedido).filter(
-        ItemPedido.produto_id == id
-    ).first() is not None
+    has_orders = await db.scalar(
+        select(ItemPedido.id).filter(ItemPedido.produto_id == id).limit(1)
+    ) is not None
     
     if has_orders:
         # Soft delete (marca como inativo)
         db_product.ativo = False
         db_product.atualizado_em = datetime.now(timezone.utc)
-        db.commit()
+        await cache_registry.invalidate(db, "products", id)
+        await db.commit()
         return {"message": "Product deactivated (has existing orders)"}
     else:
         # Delete físico (se não tiver pedidos)
-        db.delete(db_product)
-        db.commit()
+        await db.delete(db_product)
+        await cache_registry.invalidate(db, "products", id)
+        await db.commit()
         return {"message": "Product permanently deleted"}
 
 # UPDATE
-async def update_product_stock(db: Session, product_id: int, quantity_change: int):
+async def update_product_stock(db: AsyncSession, product_id: int, quantity_change: int):
     """Atualiza o estoque de um produto (usado ao processar pedidos)"""
-    product = await get_product(db, product_id)
+    product = await db.get(Produto, product_id)
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
     
     new_stock = product.estoque + quantity_change
     if new_stock < 0:
@@ -178,13 +244,20 @@ async def update_product_stock(db: Session, product_id: int, quantity_change: in
     
     product.estoque = new_stock
     product.atualizado_em = datetime.now(timezone.utc)
-    db.commit()
-    db.refresh(product)
+    await cache_registry.invalidate(db, "products", product_id)
+    await db.commit()
+    await db.refresh(product)
     return product
 
-async def check_product_availability(db: Session, product_id: int, quantity: int):
+async def check_product_availability(db: AsyncSession, product_id: int, quantity: int):
     """Verifica se um produto está disponível na quantidade solicitada"""
-    product = await get_product(db, product_id)
+    # Leitura direta do banco: o estoque em cache pode estar defasado
+    product = await db.get(Produto, product_id)
+    if not product:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Product not found"
+        )
     if not product.ativo:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
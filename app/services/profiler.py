@@ -0,0 +1,116 @@
+from collections import Counter
+from fastapi import HTTPException, status
+import asyncio
+import threading
+import sys
+import os
+
+# Profiler por amostragem do worker (desativado por padrão)
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+PROFILER_INTERVAL = float(os.getenv("PROFILER_INTERVAL", "0.01"))
+PROFILER_MAX_SECONDS = float(os.getenv("PROFILER_MAX_SECONDS", "60"))
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{os.path.basename(code.co_filename)}:{name}"
+
+
+def collapse(frame) -> str:
+    """Pilha no formato "collapsed" (raiz;...;folha), usado por flamegraph.pl e speedscope"""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class ProfileSession:
+    """Amostra a pilha da thread do event loop a cada `interval` segundos.
+
+    Com `route`, só amostra enquanto houver requisições para a rota em
+    andamento e termina depois de `requests` requisições. Como o event loop
+    intercala requisições, as amostras podem incluir trabalho de outras rotas
+    executado no mesmo intervalo.
+    """
+
+    def __init__(self, thread_id: int, interval: float, route: str | None = None, requests: int = 0):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.route = route
+        self.remaining = requests
+        self.profiled_requests = 0
+        self.active_requests = 0
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.done = asyncio.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if self.route is not None and self.active_requests == 0:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[collapse(frame)] += 1
+            self.samples += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def matches(self, path: str) -> bool:
+        return self.route is not None and self.remaining > 0 and path.startswith(self.route)
+
+    def request_started(self):
+        self.active_requests += 1
+        self.remaining -= 1
+
+    def request_finished(self):
+        self.active_requests -= 1
+        self.profiled_requests += 1
+        if self.remaining <= 0 and self.active_requests == 0:
+            self.done.set()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class SamplingProfiler:
+    """Uma sessão de profiling por vez, no worker que recebeu a chamada"""
+
+    def __init__(self):
+        self.session: ProfileSession | None = None
+
+    async def run(self, seconds: float, route: str | None = None, requests: int = 0) -> ProfileSession:
+        if self.session is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A profiling session is already running"
+            )
+
+        session = ProfileSession(threading.get_ident(), PROFILER_INTERVAL, route, requests)
+        self.session = session
+        session.start()
+        try:
+            if route is None:
+                await asyncio.sleep(seconds)
+            else:
+                # `seconds` limita a espera pelas requisições da rota
+                try:
+                    await asyncio.wait_for(session.done.wait(), timeout=seconds)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            session.stop()
+            self.session = None
+        return session
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,164 @@
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy.orm import selectinload, noload
+
+# Árvore de relacionamentos expansíveis de um recurso:
+# {campo do schema: (relacionamento do ORM, schema do relacionado, sub-árvore)}
+RelationTree = dict[str, tuple]
+
+
+def parse_fields(model: type[BaseModel], fields: str | None) -> set[str] | None:
+    """Converte o parâmetro `fields=` (nomes ou aliases, separados por vírgula) em campos do schema"""
+    if fields is None:
+        return None
+
+    lookup = {}
+    for name, info in model.model_fields.items():
+        lookup[name] = name
+        if info.alias:
+            lookup[info.alias] = name
+
+    selected = set()
+    for field in fields.split(","):
+        field = field.strip()
+        if not field:
+            continue
+        if field not in lookup:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field: {field}"
+            )
+        selected.add(lookup[field])
+    return selected
+
+
+def parse_expand(model: type[BaseModel], tree: RelationTree, expand: str | None) -> set[str]:
+    """Converte o parâmetro `expand=` em caminhos da árvore (ex.: items.product).
+
+    Sem o parâmetro, todos os relacionamentos são expandidos (comportamento
+    anterior); `expand=` vazio não expande nenhum.
+    """
+    if expand is None:
+        return all_paths(tree)
+
+    expanded = set()
+    for value in expand.split(","):
+        value = value.strip()
+        if not value:
+            continue
+
+        path = []
+        current_model, current_tree = model, tree
+        for part in value.split("."):
+            name = field_name(current_model, part)
+            if name not in current_tree:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Cannot expand: {value}"
+                )
+            path.append(name)
+            # Expandir um nível implica expandir os anteriores
+            expanded.add(".".join(path))
+            _, current_model, current_tree = current_tree[name]
+    return expanded
+
+
+def field_name(model: type[BaseModel], name: str) -> str:
+    """Nome do campo no schema a partir do nome ou do alias"""
+    for field, info in model.model_fields.items():
+        if name in (field, info.alias):
+            return field
+    return name
+
+
+def all_paths(tree: RelationTree, prefix: str = "") -> set[str]:
+    paths = set()
+    for name, (_, _, children) in tree.items():
+        path = prefix + name
+        paths.add(path)
+        paths |= all_paths(children, path + ".")
+    return paths
+
+
+def load_options(tree: RelationTree, expanded: set[str], prefix: str = "", parent=None) -> list:
+    """Opções de carregamento: selectinload no que foi expandido e noload no restante"""
+    options = []
+    for name, (relationship, _, children) in tree.items():
+        path = prefix + name
+        if path in expanded:
+            loader = selectinload(relationship) if parent is None else parent.selectinload(relationship)
+            options.append(loader)
+            options += load_options(children, expanded, path + ".", loader)
+        else:
+            options.append(noload(relationship) if parent is None else parent.noload(relationship))
+    return options
+
+
+def exclude_unexpanded(tree: RelationTree, expanded: set[str], prefix: str = "") -> dict:
+    """Campos de relacionamento a omitir na resposta (não foram carregados)"""
+    exclude = {}
+    for name, (relationship, _, children) in tree.items():
+        path = prefix + name
+        if path not in expanded:
+            exclude[name] = True
+            continue
+
+        nested = exclude_unexpanded(children, expanded, path + ".")
+        if nested:
+            is_collection = relationship.property.uselist
+            exclude[name] = {"__all__": nested} if is_collection else nested
+    return exclude
+
+
+def sparse_fieldset(
+    model: type[BaseModel],
+    tree: RelationTree,
+    fields: str | None,
+    expand: str | None
+) -> tuple[set[str], set[str] | None, dict]:
+    """Resolve `fields=` e `expand=` de uma listagem.
+
+    Retorna os caminhos a carregar, os campos incluídos na resposta e os
+    relacionamentos a omitir. Com `fields=` e sem `expand=`, só são expandidos
+    os relacionamentos pedidos em `fields`.
+    """
+    selected = parse_fields(model, fields)
+    if expand is None and selected is not None:
+        expanded = {
+            path for path in all_paths(tree) if path.split(".")[0] in selected
+        }
+    else:
+        expanded = parse_expand(model, tree, expand)
+
+    include = None
+    if selected is not None:
+        # Relacionamentos expandidos sempre fazem parte da resposta
+        include = selected | {path.split(".")[0] for path in expanded}
+    return expanded, include, exclude_unexpanded(tree, expanded)
+
+
+def json_list_response(
+    adapter: TypeAdapter,
+    items,
+    next_cursor: str | None = None,
+    include: set[str] | None = None,
+    exclude: dict | None = None,
+    headers: dict | None = None
+) -> Response:
+    """Serializa uma listagem direto para JSON com um TypeAdapter pré-construído.
+
+    Os objetos do ORM são validados uma única vez e convertidos para bytes pelo
+    pydantic-core, sem a etapa intermediária de dicts + json.dumps que o
+    response_model do FastAPI executa. O response_model continua declarado na
+    rota apenas para a documentação (OpenAPI).
+    """
+    content = adapter.dump_json(
+        adapter.validate_python(items, from_attributes=True),
+        by_alias=True,
+        include={"__all__": include} if include is not None else None,
+        exclude={"__all__": exclude} if exclude else None
+    )
+    headers = dict(headers or {})
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+    return Response(content=content, media_type="application/json", headers=headers)
@@ -1,13 +1,96 @@
+from fastapi import HTTPException, status
+from pydantic import ValidationError
+from typing import BinaryIO, Iterator
+import base64
+import csv
+import io
+import json
+import os
 import re
 
+# Linhas lidas/validadas por bloco nas importações em massa
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "5000"))
+# Quantidade máxima de erros detalhados no relatório de importação
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+# Pesos dos dois dígitos verificadores do CPF
+CPF_WEIGHTS_1 = tuple(range(10, 1, -1))
+CPF_WEIGHTS_2 = tuple(range(11, 1, -1))
+CPF_REPEATED = {str(digit) * 11 for digit in range(10)}
+
+def cpf_check_digit(digits: list[int], weights: tuple[int, ...]) -> int:
+    """Calcula um dígito verificador do CPF"""
+    return sum(d * w for d, w in zip(digits, weights)) * 10 % 11 % 10
+
 def validate_cpf(cpf: str):
-    """Validação simples de CPF (pode ser implementada a validação real)"""
-    cpf = remove_special_characters(cpf)
-    
-    if len(cpf) != 11 or not cpf.isdigit():
-        return False
-    return True
+    """Validação de CPF com os dígitos verificadores"""
+    return validate_cpfs([cpf])[0]
+
+def validate_cpfs(cpfs: list[str]) -> list[bool]:
+    """Valida uma lista de CPFs, um a um (as importações chamam uma vez por bloco)"""
+    results = []
+    for cpf in cpfs:
+        cpf = remove_special_characters(cpf)
+        if len(cpf) != 11 or cpf in CPF_REPEATED:
+            results.append(False)
+            continue
+        
+        digits = [int(c) for c in cpf]
+        results.append(
+            cpf_check_digit(digits[:9], CPF_WEIGHTS_1) == digits[9]
+            and cpf_check_digit(digits[:10], CPF_WEIGHTS_2) == digits[10]
+        )
+    return results
 
 def remove_special_characters(cpf: str):
     """Remove caracteres especiais de um CPF"""
-    return re.sub(r'[^0-9]', '', cpf)
\ No newline at end of file
+    return re.sub(r'[^0-9]', '', cpf)
+
+def encode_cursor(*values) -> str:
+    """Gera um cursor opaco (base64) a partir dos valores da chave de ordenação"""
+    raw = json.dumps(values, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, *types) -> list:
+    """Lê um cursor gerado por encode_cursor, convertendo cada valor com o tipo informado"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor size mismatch")
+        return [convert(value) for convert, value in zip(types, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+def iter_upload_rows(file: BinaryIO, file_format: str) -> Iterator[tuple[int, dict | None, str | None]]:
+    """Lê um arquivo CSV ou NDJSON linha a linha, gerando (linha, registro, erro de leitura)"""
+    stream = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+
+    if file_format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            # Campos vazios assumem o valor padrão do schema
+            yield reader.line_num, {k: v for k, v in row.items() if k and v not in ("", None)}, None
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as exc:
+            yield line_number, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Each line must be a JSON object"
+            continue
+        yield line_number, row, None
+
+def format_validation_error(exc: ValidationError) -> str:
+    """Resume os erros de validação do Pydantic em uma linha"""
+    return "; ".join(
+        f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in exc.errors()
+    )
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""Fixtures dos testes.
+
+Os testes rodam contra o PostgreSQL configurado pelas variáveis DB_* (use um
+banco dedicado); sem banco acessível eles são ignorados. Cada cenário roda em
+uma transação desfeita ao final, sem deixar dados no banco (os commits dos
+serviços viram savepoints dessa transação).
+
+Uso (a partir da pasta app):
+    python -m pytest tests
+"""
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from connectDB.database import engine, init_db, SessionLocal
+from connectDB.instrumentation import QueryStats, query_stats
+import asyncio
+import pytest
+
+
+def run_in_transaction(scenario):
+    """Executa `await scenario(db)` e desfaz a transação no final"""
+
+    async def main():
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        except (OSError, DBAPIError) as exc:
+            pytest.skip(f"PostgreSQL unavailable: {exc}")
+
+        try:
+            await init_db()
+            # Sessão presa a uma transação externa: commit e rollback dos serviços
+            # viram savepoints, e a transação inteira é desfeita no final
+            async with engine.connect() as conn:
+                await conn.begin()
+                async with SessionLocal(bind=conn, join_transaction_mode="create_savepoint") as db:
+                    try:
+                        return await scenario(db)
+                    finally:
+                        await conn.rollback()
+        finally:
+            # Cada teste usa um event loop novo: conexões do pool não podem ser reaproveitadas
+            await engine.dispose()
+
+    return asyncio.run(main())
+
+
+async def count_queries(func, *args, **kwargs) -> tuple:
+    """Resultado de `await func(...)` e quantidade de comandos SQL executados"""
+    stats = QueryStats()
+    token = query_stats.set(stats)
+    try:
+        result = await func(*args, **kwargs)
+    finally:
+        query_stats.reset(token)
+    return result, stats.count
+
+
+@pytest.fixture
+def in_transaction():
+    return run_in_transaction
+
+
+@pytest.fixture
+def queries():
+    return count_queries
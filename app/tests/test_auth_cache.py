@@ -0,0 +1,116 @@
+"""Cache de usuários autenticados e tokens com id e status embutidos"""
+from fastapi import HTTPException
+from sqlalchemy import select
+from connectDB.database import Usuario
+from dependencies import get_current_user
+from schemas.auth import UserUpdate
+from services.auth import (
+    create_access_token, login_user, update_user, delete_user, pwd_context, user_cache, verify_token
+)
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+import asyncio
+import dependencies
+import pytest
+import services.auth
+
+
+async def seed_user(db, password: str = "-") -> Usuario:
+    user = Usuario(nome="Teste", email=f"{uuid4().hex[:10]}@example.com", senha_hash=password, ativo=True)
+    db.add(user)
+    # Commit (savepoint da transação do teste): o rollback seguinte expira o usuário em vez de descartá-lo
+    await db.commit()
+    user_cache.delete(user.email)
+    return user
+
+
+def access_token(email: str, **claims) -> str:
+    return create_access_token({"sub": email, **claims}, expires_delta=timedelta(minutes=5))
+
+
+def test_cache_miss_queries_once_then_hits(in_transaction, queries):
+    async def scenario(db):
+        user = await seed_user(db)
+        token = access_token(user.email)
+        db.expunge_all()
+        # Abre o savepoint seguinte antes da contagem
+        await db.execute(select(1))
+        first, miss_queries = await queries(get_current_user, token, db)
+        second, hit_queries = await queries(get_current_user, token, db)
+        return first, second, miss_queries, hit_queries
+
+    first, second, miss_queries, hit_queries = in_transaction(scenario)
+    assert (miss_queries, hit_queries) == (1, 0)
+    assert second is first
+
+
+def test_cached_user_survives_session_rollback(in_transaction):
+    async def scenario(db):
+        user = await seed_user(db)
+        email, token = user.email, access_token(user.email)
+        db.expunge_all()
+        first = await get_current_user(token, db)
+        # Rollback na sessão da requisição (ex.: pedido recusado por falta de estoque)
+        await db.rollback()
+        cached = await get_current_user(token, db)
+        return email, first, cached
+
+    email, first, cached = in_transaction(scenario)
+    assert cached is first
+    assert (cached.id, cached.email, cached.ativo) == (first.id, email, True)
+
+
+def test_update_user_invalidates_previous_email(in_transaction):
+    async def scenario(db):
+        user = await seed_user(db)
+        old_email, new_email = user.email, f"{uuid4().hex[:10]}@example.com"
+        await get_current_user(access_token(old_email), db)
+        cached_before = user_cache.get(old_email)
+        await update_user(user.id, UserUpdate(email=new_email), db)
+        return cached_before, user_cache.get(old_email)
+
+    cached_before, cached_after = in_transaction(scenario)
+    assert cached_before is not None
+    assert cached_after is None
+
+
+def test_delete_user_invalidates_cache(in_transaction):
+    async def scenario(db):
+        user = await seed_user(db)
+        email = user.email
+        token = access_token(email)
+        await get_current_user(token, db)
+        await delete_user(user.id, db)
+        cached = user_cache.get(email)
+        with pytest.raises(HTTPException) as exc:
+            await get_current_user(token, db)
+        return cached, exc.value.status_code
+
+    cached, status_code = in_transaction(scenario)
+    assert cached is None
+    assert status_code == 401
+
+
+def test_embedded_claims_cap_token_lifetime(in_transaction, monkeypatch):
+    monkeypatch.setattr(services.auth, "JWT_EMBED_CLAIMS", True)
+    monkeypatch.setattr(services.auth, "JWT_EMBED_CLAIMS_EXPIRE_MINUTES", 5)
+
+    async def scenario(db):
+        user = await seed_user(db, password=pwd_context.hash("segredo"))
+        tokens = await login_user(user.email, "segredo", db)
+        return user.id, verify_token(tokens["access_token"])
+
+    user_id, payload = in_transaction(scenario)
+    assert (payload["uid"], payload["active"]) == (user_id, True)
+    lifetime = datetime.fromtimestamp(payload["exp"], timezone.utc) - datetime.now(timezone.utc)
+    assert lifetime <= timedelta(minutes=5)
+
+
+def test_embedded_claims_reject_inactive_user(monkeypatch):
+    monkeypatch.setattr(dependencies, "JWT_EMBED_CLAIMS", True)
+    token = access_token(f"{uuid4().hex[:10]}@example.com", uid=1, active=False)
+
+    # Sem consulta ao banco: a sessão não é usada nesse caminho
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(get_current_user(token, None))
+    assert exc.value.status_code == 401
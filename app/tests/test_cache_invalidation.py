@@ -0,0 +1,64 @@
+"""Invalidação de cache atrelada ao commit da escrita (local e via NOTIFY)"""
+from connectDB.database import SessionLocal, engine
+from services.cache import TTLCache, cache_registry
+from services.invalidation import PostgresInvalidation, CHANNEL
+from uuid import uuid4
+import asyncio
+import asyncpg
+import json
+import pytest
+
+cache = cache_registry.register("test_invalidation", TTLCache(maxsize=10, ttl=60))
+
+
+@pytest.fixture
+def backend():
+    backend = PostgresInvalidation(engine)
+    cache_registry.backend = backend
+    yield backend
+    cache_registry.backend = None
+
+
+def test_local_eviction_waits_for_commit(in_transaction):
+    async def scenario(db):
+        cache.set("committed", 1)
+        await cache_registry.invalidate(db, "test_invalidation", "committed")
+        before_commit = cache.get("committed")
+        await db.commit()
+        after_commit = cache.get("committed")
+
+        cache.set("rolled_back", 1)
+        await cache_registry.invalidate(db, "test_invalidation", "rolled_back")
+        await db.rollback()
+        return before_commit, after_commit, cache.get("rolled_back")
+
+    assert in_transaction(scenario) == (1, None, 1)
+
+
+def test_notify_is_delivered_only_on_commit(in_transaction, backend):
+    async def scenario(db):
+        received = []
+        listener = await asyncpg.connect(backend.listen_url)
+        await listener.add_listener(CHANNEL, lambda *args: received.append(json.loads(args[-1])))
+        try:
+            committed, rolled_back = uuid4().hex, uuid4().hex
+            # Sessões próprias: a transação do teste nunca é confirmada, e o NOTIFY só sai no commit
+            async with SessionLocal() as session:
+                await cache_registry.invalidate(session, "test_invalidation", rolled_back)
+                await session.rollback()
+                await cache_registry.invalidate(session, "test_invalidation", committed)
+                pending = list(received)
+                await session.commit()
+
+            for _ in range(50):
+                if received:
+                    break
+                await asyncio.sleep(0.02)
+            await asyncio.sleep(0.1)
+            return pending, [message["keys"] for message in received], committed
+        finally:
+            await listener.close()
+
+    pending, delivered, committed = in_transaction(scenario)
+    assert pending == []
+    assert delivered == [[committed]]
@@ -0,0 +1,99 @@
+"""Importação de clientes em blocos: duplicados e rollback por bloco"""
+from sqlalchemy import select, insert
+from connectDB.database import Cliente
+from services.utilities import cpf_check_digit, CPF_WEIGHTS_1, CPF_WEIGHTS_2
+from uuid import uuid4
+import io
+import json
+import services.client_import
+from services.client_import import import_clients
+
+
+def new_cpf() -> str:
+    """CPF válido e (na prática) inédito"""
+    digits = [int(c) for c in f"{uuid4().int % 10**9:09d}"]
+    digits.append(cpf_check_digit(digits, CPF_WEIGHTS_1))
+    digits.append(cpf_check_digit(digits, CPF_WEIGHTS_2))
+    return "".join(str(d) for d in digits)
+
+
+def new_email(marker: str, name: str) -> str:
+    return f"{marker}-{name}@example.com"
+
+
+def ndjson(rows: list[dict]) -> io.BytesIO:
+    return io.BytesIO("\n".join(json.dumps(row) for row in rows).encode())
+
+
+def client_row(email: str, cpf: str) -> dict:
+    return {"nome": "Cliente", "sobrenome": "Teste", "email": email, "cpf": cpf}
+
+
+async def imported_emails(db, marker: str) -> set[str]:
+    result = await db.execute(select(Cliente.email).filter(Cliente.email.like(f"{marker}-%")))
+    return set(result.scalars())
+
+
+def test_duplicates_are_rejected_within_and_across_chunks(in_transaction, monkeypatch):
+    monkeypatch.setattr(services.client_import, "IMPORT_CHUNK_SIZE", 2)
+    marker = uuid4().hex[:10]
+    email = lambda name: new_email(marker, name)
+    cpf_a, cpf_b, cpf_d, cpf_existing = new_cpf(), new_cpf(), new_cpf(), new_cpf()
+
+    async def scenario(db):
+        # Cliente já cadastrado antes da importação
+        await db.execute(insert(Cliente), [{**client_row(email("existing"), cpf_existing), "sobrenome": "Base"}])
+        await db.commit()
+
+        report = await import_clients(db, ndjson([
+            client_row(email("a"), cpf_a),                # bloco 1
+            client_row(email("b"), cpf_b),
+            client_row(email("a"), new_cpf()),            # bloco 2: e-mail de um bloco anterior
+            client_row(email("c"), cpf_a),                #          CPF de um bloco anterior
+            client_row(email("d"), cpf_d),                # bloco 3
+            client_row(email("d"), new_cpf()),            #          e-mail repetido no mesmo bloco
+            client_row(email("e"), "52998224724"),        # bloco 4: CPF inválido
+            client_row(email("existing"), new_cpf()),     #          e-mail já cadastrado
+        ]))
+        return report, await imported_emails(db, marker)
+
+    report, emails = in_transaction(scenario)
+    assert (report["received"], report["inserted"], report["rejected"]) == (8, 3, 5)
+    assert {(error["line"], error["error"]) for error in report["errors"]} == {
+        (3, "Email already registered"),
+        (4, "CPF already registered"),
+        (6, "Email already registered"),
+        (7, "Invalid CPF"),
+        (8, "Email already registered"),
+    }
+    assert emails == {email("existing"), email("a"), email("b"), email("d")}
+
+
+def test_failing_chunk_is_rolled_back_alone(in_transaction, monkeypatch):
+    monkeypatch.setattr(services.client_import, "IMPORT_CHUNK_SIZE", 2)
+    marker = uuid4().hex[:10]
+    email = lambda name: new_email(marker, name)
+    insert_clients = services.client_import.insert_clients
+    calls = []
+
+    async def insert_with_concurrent_duplicate(db, clients):
+        calls.append(len(clients))
+        if len(calls) == 2:
+            # Outra requisição grava o mesmo e-mail depois da checagem de duplicados
+            await db.execute(insert(Cliente), [client_row(clients[0].email, new_cpf())])
+        await insert_clients(db, clients)
+
+    monkeypatch.setattr(services.client_import, "insert_clients", insert_with_concurrent_duplicate)
+
+    async def scenario(db):
+        report = await import_clients(db, ndjson([
+            client_row(email(name), new_cpf()) for name in ("a", "b", "c", "d", "e", "f")
+        ]))
+        return report, await imported_emails(db, marker)
+
+    report, emails = in_transaction(scenario)
+    assert (report["received"], report["inserted"], report["rejected"]) == (6, 4, 2)
+    assert [error["line"] for error in report["errors"]] == [3, 4]
+    assert all(error["error"].startswith("Chunk rolled back") for error in report["errors"])
+    # Os blocos 1 e 3 continuam gravados; o bloco 2 (e o registro concorrente) foi desfeito
+    assert emails == {email("a"), email("b"), email("e"), email("f")}
@@ -0,0 +1,56 @@
+"""Quantidade de consultas e duplicidade na listagem de clientes"""
+from connectDB.database import Cliente, Endereco
+from services.clients import get_clients
+from uuid import uuid4
+
+# clientes + endereços
+CLIENT_PAGE_QUERIES = 2
+
+
+async def seed_clients(db, count: int) -> tuple[str, str]:
+    """Cria `count` clientes com dois endereços principais na mesma cidade e um secundário.
+
+    Retorna (nome, cidade) exclusivos dos clientes criados.
+    """
+    marker = uuid4().hex[:10]
+    name, city = f"T{marker}", f"Cidade {marker}"
+    for index in range(count):
+        db.add(Cliente(
+            nome=name, sobrenome=str(index), email=f"{marker}-{index}@example.com",
+            cpf=f"{uuid4().int % 10**11:011d}",
+            enderecos=[
+                Endereco(logradouro="Rua A", numero="1", cidade=city, estado="SP", principal=True),
+                Endereco(logradouro="Rua B", numero="2", cidade=city, estado="SP", principal=True),
+                Endereco(logradouro="Rua C", numero="3", cidade="Outra", estado="RJ", principal=False),
+            ],
+        ))
+    await db.flush()
+    # Identity map vazio: a listagem carrega tudo do banco, como em uma requisição
+    db.expunge_all()
+    return name, city
+
+
+def test_client_page_query_count_does_not_depend_on_page_size(in_transaction, queries):
+    async def scenario(db):
+        name, _ = await seed_clients(db, 20)
+        counts = {}
+        for limit in (1, 20):
+            clients, counts[limit] = await queries(get_clients, db, limit=limit, name=name)
+            assert len(clients) == limit
+            assert all(len(client.enderecos) == 3 for client in clients)
+            db.expunge_all()
+        return counts
+
+    counts = in_transaction(scenario)
+    assert counts[1] == counts[20] == CLIENT_PAGE_QUERIES
+
+
+def test_city_filter_returns_each_client_once(in_transaction):
+    async def scenario(db):
+        name, city = await seed_clients(db, 5)
+        clients = await get_clients(db, limit=100, name=name, city=city)
+        return [client.id for client in clients]
+
+    ids = in_transaction(scenario)
+    assert len(ids) == 5
+    assert len(set(ids)) == len(ids)
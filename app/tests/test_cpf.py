@@ -0,0 +1,34 @@
+"""Validação de CPF pelos dígitos verificadores (não usa o banco)"""
+from services.utilities import validate_cpf, validate_cpfs
+import pytest
+
+
+@pytest.mark.parametrize("cpf", ["52998224725", "11144477735", "12345678909", "529.982.247-25", " 111.444.777-35 "])
+def test_valid_cpfs(cpf):
+    assert validate_cpf(cpf)
+
+
+@pytest.mark.parametrize("cpf", [
+    "52998224724",      # segundo dígito errado
+    "52998224715",      # primeiro dígito errado
+    "111.444.777-53",   # dígitos trocados
+])
+def test_wrong_check_digits(cpf):
+    assert not validate_cpf(cpf)
+
+
+@pytest.mark.parametrize("digit", "0123456789")
+def test_repeated_digits_are_invalid(digit):
+    # 000.000.000-00, 111.111.111-11, ... passam no cálculo, mas não são CPFs válidos
+    assert not validate_cpf(digit * 11)
+
+
+@pytest.mark.parametrize("cpf", ["", "5299822472", "529982247250", "529.982.247", "abc"])
+def test_wrong_length_is_invalid(cpf):
+    assert not validate_cpf(cpf)
+
+
+def test_batch_keeps_input_order():
+    cpfs = ["52998224725", "11111111111", "111.444.777-35", "123"]
+    assert validate_cpfs(cpfs) == [True, False, True, False]
+    assert validate_cpfs([]) == []
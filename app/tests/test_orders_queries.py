@@ -0,0 +1,61 @@
+"""Quantidade de consultas da listagem de pedidos (sem N+1)"""
+from sqlalchemy import select
+from connectDB.database import (
+    Usuario, Cliente, CategoriaProduto, Produto, ImagemProduto, Pedido, ItemPedido
+)
+from services.orders import get_orders
+from decimal import Decimal
+from uuid import uuid4
+
+# pedidos + itens + produtos + imagens
+ORDER_PAGE_QUERIES = 4
+
+
+async def seed_orders(db, count: int) -> int:
+    """Cria `count` pedidos (2 itens, produtos com 2 imagens) de um cliente novo; retorna o id do cliente"""
+    marker = uuid4().hex[:12]
+    user_id = await db.scalar(select(Usuario.id).order_by(Usuario.id).limit(1))
+
+    category = CategoriaProduto(nome=f"test-{marker}")
+    client = Cliente(
+        nome="Teste", sobrenome="Consultas", email=f"{marker}@example.com",
+        cpf=f"{uuid4().int % 10**11:011d}",
+    )
+    products = [
+        Produto(
+            nome=f"Produto {index}", descricao="Teste", valor_venda=Decimal("10.00"),
+            codigo_barras=f"test-{marker}-{index}", categoria=category, estoque=100,
+            imagens=[ImagemProduto(url=f"https://cdn.example.com/{marker}/{index}/{order}.jpg", ordem=order)
+                     for order in (1, 2)],
+        )
+        for index in range(3)
+    ]
+    for index in range(count):
+        db.add(Pedido(
+            cliente=client, usuario_id=user_id, valor_total=Decimal("20.00"),
+            itens=[
+                ItemPedido(produto=product, quantidade=1, preco_unitario=Decimal("10.00"), total_item=Decimal("10.00"))
+                for product in (products[index % 3], products[(index + 1) % 3])
+            ],
+        ))
+    await db.flush()
+    client_id = client.id
+    # Identity map vazio: a listagem carrega tudo do banco, como em uma requisição
+    db.expunge_all()
+    return client_id
+
+
+def test_order_page_query_count_does_not_depend_on_page_size(in_transaction, queries):
+    async def scenario(db):
+        client_id = await seed_orders(db, 50)
+        counts = {}
+        for limit in (1, 50):
+            orders, counts[limit] = await queries(get_orders, db, limit=limit, client_id=client_id)
+            assert len(orders) == limit
+            assert all(len(order.itens) == 2 for order in orders)
+            assert all(len(item.produto.imagens) == 2 for order in orders for item in order.itens)
+            db.expunge_all()
+        return counts
+
+    counts = in_transaction(scenario)
+    assert counts[1] == counts[50] == ORDER_PAGE_QUERIES